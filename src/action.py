@@ -28,20 +28,30 @@ class Action():
     """A simple container class to hold information about an action that
     changed a board state
     """
+    __slots__ = ['board', 'piece', 'method']
 
-    def __init__(self, piece, method_str):
+    def __init__(self, board, piece, method_str):
         """Creates an action
 
         Args:
+            board (Board): the board that this action is applied to
             piece (Piece): the piece that this action is for
             method_str (str): the method name that the piece would invoke
         """
-        self.board = piece.board
+        self.board = board
         self.piece = piece
-        self.piece_name = piece.__class__.__name__  # for convenience
-        self.piece_index = piece.index
         self.method = method_str
 
+    @property
+    def piece_name(self):
+        """str: the class name of the piece, for convenience"""
+        return self.piece.__class__.__name__
+
+    @property
+    def piece_index(self):
+        """int: the index of the piece, for convenience"""
+        return self.piece.index
+
     def generate(self):
         """Generates the new Board that this Action represents
 
@@ -50,6 +60,15 @@ class Action():
         """
         return self.board.__class__(self)  # note: this avoids cyclic reference
 
+    def to_tuple(self):
+        """Returns the compact form of this Action, which does not reference
+        any board or piece. Use `Board.follow()` to apply it again
+
+        Returns:
+            tuple: (piece_name, piece_index, method)
+        """
+        return (self.piece_name, self.piece_index, self.method)
+
     def __repr__(self):
         """Returns the human readable string representation of the Action
 
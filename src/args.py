@@ -8,5 +8,30 @@ _parser = argparse.ArgumentParser(
 
 _parser.add_argument('algorithm', nargs='?', default='bfts')
 _parser.add_argument('file', nargs='?', default='./puzzles/examplePuzzle.txt')
+_parser.add_argument('--verify-hashes', action='store_true',
+                     help='check the state hashes for collisions (slow)')
+_parser.add_argument('--max-nodes', type=int, default=None,
+                     help='the most boards sma_star keeps in memory '
+                     '(default: 100000)')
+_parser.add_argument('--max-bytes', type=int, default=None,
+                     help='roughly the most bytes of boards sma_star keeps '
+                     'in memory')
+_parser.add_argument('--deadline', type=float, default=None,
+                     help='seconds ara_star searches for better paths '
+                     '(default: 10)')
+_parser.add_argument('--cache', default='./.cache/',
+                     help='directory of cached solutions (default: ./.cache/)')
+_parser.add_argument('--no-cache', action='store_true',
+                     help='always search, without using the cache')
+_parser.add_argument('--checkpoint', default=None,
+                     help='file astar_gs saves its state to every so often')
+_parser.add_argument('--checkpoint-interval', type=float, default=60,
+                     help='seconds between checkpoints (default: 60)')
+_parser.add_argument('--resume', action='store_true',
+                     help='resume astar_gs from the --checkpoint file')
+_parser.add_argument('--report', choices=['terminal', 'json', 'silent'],
+                     default='terminal',
+                     help='how to show search stats while searching '
+                     '(default: terminal)')
 
 args = _parser.parse_args()
@@ -0,0 +1,126 @@
+"""Solves many puzzle files at once, spread across worker processes, and
+writes one line of JSON stats per puzzle as each one is solved
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import json
+import os.path
+import sys
+
+from cache import SolutionCache
+from solver import solve_file
+
+
+def find_puzzles(patterns):
+    """Finds the puzzle files to solve
+
+    Args:
+        patterns (list[str]): directories (every .txt file in them is used),
+            glob patterns, or paths to puzzle files
+
+    Returns:
+        list[str]: the sorted paths of the puzzle files, without duplicates
+    """
+    puzzles = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.txt')
+
+        puzzles.update(path for path in glob.glob(pattern)
+                       if os.path.isfile(path))
+
+    return sorted(puzzles)
+
+
+def _solve_quietly(puzzle_path, algorithm, solution_dir, cache_dir):
+    """Runs in a worker process to solve one puzzle file, turning any error
+    into stats so one bad puzzle does not stop the batch
+
+    Returns:
+        dict: the stats from `solver.solve_file()`
+    """
+    cache = None if cache_dir is None else SolutionCache(cache_dir)
+    try:
+        return solve_file(puzzle_path, algorithm, solution_dir, cache)
+    except Exception as exception:
+        return {
+            'puzzle': puzzle_path,
+            'algorithm': algorithm,
+            'solved': False,
+            'error': repr(exception),
+        }
+
+
+def run_batch(puzzle_paths, algorithm, workers=None,
+              solution_dir='./solutions/', out=sys.stdout, cache_dir=None):
+    """Solves puzzle files in parallel, writing each solution file like
+    main.py does
+
+    Args:
+        puzzle_paths (list[str]): the puzzle files to solve
+        algorithm (str): the name of the search algorithm to use
+        workers (Optional[int]): how many processes to use, defaults to the
+            number of CPUs
+        solution_dir (Optional[str]): the directory solutions go in
+        out (Optional[file]): where to write the JSON lines of stats
+        cache_dir (Optional[str]): the directory of the solution cache the
+            workers share, None to not use one
+
+    Returns:
+        list[dict]: the stats of every puzzle, in the order they finished
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_solve_quietly, path, algorithm, solution_dir,
+                            cache_dir)
+            for path in puzzle_paths
+        ]
+
+        for future in as_completed(futures):
+            stats = future.result()
+            results.append(stats)
+            out.write(json.dumps(stats) + '\n')
+            out.flush()
+
+    return results
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser(
+        description='Solves many puzzle files in parallel')
+
+    _parser.add_argument('algorithm', nargs='?', default='astar_gs')
+    _parser.add_argument('puzzles', nargs='*', default=['./puzzles/'],
+                         help='puzzle files, directories of them, or globs')
+    _parser.add_argument('-w', '--workers', type=int, default=None,
+                         help='number of worker processes (default: CPUs)')
+    _parser.add_argument('--solutions', default='./solutions/',
+                         help='directory to write solution files to')
+    _parser.add_argument('--cache', default='./.cache/',
+                         help='directory of cached solutions (default: '
+                         './.cache/)')
+    _parser.add_argument('--no-cache', action='store_true',
+                         help='always search, without using the cache')
+    _parser.add_argument('--stats', default=None,
+                         help='file to write the JSON lines to (default: '
+                         'stdout)')
+
+    _args = _parser.parse_args()
+
+    _puzzles = find_puzzles(_args.puzzles)
+    if not _puzzles:
+        print('Error! No puzzle files found in {}'.format(_args.puzzles))
+        sys.exit(1)
+
+    _cache_dir = None if _args.no_cache else _args.cache
+
+    if _args.stats:
+        with open(_args.stats, 'w') as _out:
+            run_batch(_puzzles, _args.algorithm, _args.workers,
+                      _args.solutions, _out, _cache_dir)
+    else:
+        run_batch(_puzzles, _args.algorithm, _args.workers, _args.solutions,
+                  cache_dir=_cache_dir)
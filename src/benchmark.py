@@ -0,0 +1,346 @@
+"""Benchmarks the search algorithms over puzzle files, so changes to the
+engine or the searches can be judged by more than eyeballing them
+
+Every (puzzle, algorithm) pair is run in its own process, one at a time, so
+runs do not share memory or caches and a run that takes too long can be
+stopped. The results are written as JSON, and can be compared against the
+results of a previous run
+
+Peak memory is measured with tracemalloc, which only sees the process it is
+in. The searches that work in processes of their own (hda_star and
+portfolio) also get the peak resident memory of their largest process, from
+`resource` where there is one
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import queue
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not on Windows, so no peak memory of child processes
+    resource = None
+
+from batch import find_puzzles
+from formatter import board_from_file
+import search
+
+
+# how often (in seconds) benchmark() checks if a run's process died
+_poll = 0.1
+
+# the stats compared by `compare()`, and if a higher value is better
+_compared = [
+    ('wall_time', False),
+    ('expanded', False),
+    ('generated', False),
+    ('expanded_per_second', True),
+    ('peak_memory', False),
+    ('children_peak_memory', False),
+    ('radiation', False),
+    ('length', False),
+]
+
+
+def _benchmark_worker(puzzle_path, algorithm, trace_memory, results):
+    """Runs in its own process to benchmark one algorithm on one puzzle, and
+    sends the stats of the run to results
+    """
+    with open(puzzle_path, 'r') as file:
+        board = board_from_file(file.read())
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    path, stats = search.run(algorithm, board)
+    wall_time = time.perf_counter() - start
+
+    run = stats.as_dict()
+    run['wall_time'] = wall_time
+    run['peak_memory'] = tracemalloc.get_traced_memory()[1] \
+        if trace_memory else None
+    run['children_peak_memory'] = _children_peak_memory() \
+        if trace_memory else None
+    run['solved'] = path is not None
+    if path is not None:
+        run['length'] = len(path)
+        run['radiation'] = path[-1].boat.radiation if path else 0
+
+    results.put(run)
+
+
+def _children_peak_memory():
+    """Gets the peak resident memory of the largest child process the search
+    started (that has finished), which tracemalloc can't see
+
+    Returns:
+        int: the peak in bytes, or None if there were no child processes (or
+        it can't be measured here)
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if not peak:
+        return None
+
+    # it is in bytes on macOS, but kilobytes everywhere else
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def benchmark(puzzle_path, algorithm, timeout=None, trace_memory=True):
+    """Benchmarks one algorithm on one puzzle file
+
+    Args:
+        puzzle_path (str): the path to the puzzle file
+        algorithm (str): the name of the search algorithm to use
+        timeout (Optional[number]): seconds to wait for it to finish, before
+            stopping it. None to wait forever
+        trace_memory (Optional[bool]): if the peak memory should be measured
+            with tracemalloc, which slows the search down
+
+    Returns:
+        dict: the stats of the run. 'timed_out' or 'error' are set if it did
+        not finish, the latter as soon as its process dies
+    """
+    run = {'puzzle': puzzle_path, 'algorithm': algorithm}
+
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_benchmark_worker,
+        args=(puzzle_path, algorithm, trace_memory, results)
+    )
+    process.start()
+
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+
+    try:
+        while True:
+            # check the process is alive every so often, rather than waiting
+            # all the time it was given for a result that will never come
+            wait = _poll
+            if timeout is not None:
+                wait = max(min(wait, deadline - time.monotonic()), 0)
+
+            alive = process.is_alive()
+            try:
+                run.update(results.get(timeout=wait))
+                break
+            except queue.Empty:
+                pass
+
+            if not alive:
+                # it had died before we last looked for its result
+                run['error'] = 'exited with code {}'.format(process.exitcode)
+                break
+            if timeout is not None and time.monotonic() >= deadline:
+                run['timed_out'] = True
+                break
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    return run
+
+
+def run_benchmarks(puzzle_paths, algorithm_names=None, timeout=None,
+                   trace_memory=True, out=None):
+    """Benchmarks every algorithm on every puzzle file
+
+    Args:
+        puzzle_paths (list[str]): the puzzle files to benchmark
+        algorithm_names (Optional[list[str]]): the algorithms to benchmark,
+            defaults to all of them (`search.algorithm_names`)
+        timeout (Optional[number]): seconds each run gets before it is
+            stopped, None to wait forever
+        trace_memory (Optional[bool]): if the peak memory should be measured
+        out (Optional[file]): where to write a line of progress per run
+
+    Returns:
+        dict: the results, with 'runs' being the stats of every run
+    """
+    if algorithm_names is None:
+        algorithm_names = search.algorithm_names
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cpus': multiprocessing.cpu_count(),
+        'timeout': timeout,
+        'runs': [],
+    }
+
+    for puzzle_path in puzzle_paths:
+        for algorithm in algorithm_names:
+            run = benchmark(puzzle_path, algorithm, timeout, trace_memory)
+            results['runs'].append(run)
+
+            if out:
+                out.write(_describe(run) + '\n')
+                out.flush()
+
+    return results
+
+
+def _describe(run):
+    """Gets a human readable line about a run
+
+    Returns:
+        str: the puzzle, algorithm and main stats of the run
+    """
+    if run.get('timed_out'):
+        outcome = 'timed out'
+    elif 'error' in run:
+        outcome = 'error: {}'.format(run['error'])
+    elif not run['solved']:
+        outcome = 'no path, {wall_time:.3f}s'.format(**run)
+    else:
+        outcome = '{wall_time:.3f}s, {expanded} expanded, ' \
+            '{expanded_per_second:.0f}/s, length {length}, radiation ' \
+            '{radiation}'.format(**run)
+        if run['peak_memory'] is not None:
+            outcome += ', {:.1f} MiB peak'.format(
+                run['peak_memory'] / (1024 * 1024)
+            )
+        if run.get('children_peak_memory') is not None:
+            outcome += ', {:.1f} MiB peak in child processes'.format(
+                run['children_peak_memory'] / (1024 * 1024)
+            )
+
+    return '{:<32} {:<10} {}'.format(run['puzzle'], run['algorithm'], outcome)
+
+
+def compare(previous, current):
+    """Compares two benchmark results, run by run
+
+    Args:
+        previous (dict): the older results, from `run_benchmarks()`
+        current (dict): the newer results
+
+    Returns:
+        list[dict]: one per run in both results, with the 'puzzle',
+        'algorithm', and for each compared stat a (previous, current, ratio)
+        tuple, where the ratio is current / previous. Also 'better' and
+        'worse' which list the stats that changed by more than 10%
+    """
+    old_runs = {
+        (run['puzzle'], run['algorithm']): run for run in previous['runs']
+    }
+
+    differences = []
+    for run in current['runs']:
+        old = old_runs.get((run['puzzle'], run['algorithm']))
+        if old is None:
+            continue
+
+        difference = {
+            'puzzle': run['puzzle'],
+            'algorithm': run['algorithm'],
+            'better': [],
+            'worse': [],
+        }
+        if old.get('solved') != run.get('solved'):
+            (difference['better'] if run.get('solved') else
+             difference['worse']).append('solved')
+
+        for stat, higher_is_better in _compared:
+            before, after = old.get(stat), run.get(stat)
+            if before is None or after is None:
+                continue
+
+            ratio = after / before if before else \
+                (1.0 if after == before else math.inf)
+            difference[stat] = (before, after, ratio)
+
+            if ratio > 1.1 or ratio < 1 / 1.1:
+                if (ratio > 1) == higher_is_better:
+                    difference['better'].append(stat)
+                else:
+                    difference['worse'].append(stat)
+
+        differences.append(difference)
+
+    return differences
+
+
+def _describe_difference(difference):
+    """Gets a human readable line about how a run changed
+
+    Returns:
+        str: the puzzle, algorithm and how its main stats changed
+    """
+    changes = []
+    for stat, _ in _compared:
+        if stat in difference:
+            changes.append('{} x{:.2f}'.format(stat, difference[stat][2]))
+
+    verdict = ''
+    if difference['worse']:
+        verdict = ' WORSE: ' + ', '.join(difference['worse'])
+    if difference['better']:
+        verdict += ' better: ' + ', '.join(difference['better'])
+
+    return '{:<32} {:<10} {}{}'.format(
+        difference['puzzle'], difference['algorithm'], ', '.join(changes),
+        verdict
+    )
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser(
+        description='Benchmarks the search algorithms over puzzle files')
+
+    _parser.add_argument('puzzles', nargs='*', default=['./puzzles/'],
+                         help='puzzle files, directories of them, or globs')
+    _parser.add_argument('-a', '--algorithms',
+                         default=','.join(search.algorithm_names),
+                         help='comma separated algorithms to benchmark '
+                         '(default: all of them)')
+    _parser.add_argument('-t', '--timeout', type=float, default=60,
+                         help='seconds each run gets, 0 for no limit '
+                         '(default: 60)')
+    _parser.add_argument('--no-memory', action='store_true',
+                         help='do not measure peak memory, which slows the '
+                         'searches down')
+    _parser.add_argument('-o', '--output', default=None,
+                         help='file to write the JSON results to')
+    _parser.add_argument('-c', '--compare', default=None,
+                         help='JSON results of a previous run to compare to')
+
+    _args = _parser.parse_args()
+
+    _puzzles = find_puzzles(_args.puzzles)
+    if not _puzzles:
+        print('Error! No puzzle files found in {}'.format(_args.puzzles))
+        sys.exit(1)
+
+    _algorithms = _args.algorithms.split(',')
+    for _algorithm in _algorithms:
+        if _algorithm not in search.algorithm_names:
+            print("Error! '{}' is not a search algorithm we have "
+                  "implemented".format(_algorithm))
+            sys.exit(1)
+
+    _results = run_benchmarks(_puzzles, _algorithms, _args.timeout or None,
+                              not _args.no_memory, sys.stdout)
+
+    if _args.output:
+        with open(_args.output, 'w') as _file:
+            json.dump(_results, _file, indent=2)
+
+    if _args.compare:
+        with open(_args.compare, 'r') as _file:
+            _previous = json.load(_file)
+
+        print('\n=== COMPARED TO {} ==='.format(_args.compare))
+        for _difference in compare(_previous, _results):
+            print(_describe_difference(_difference))
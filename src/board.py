@@ -1,4 +1,11 @@
-from pieces import Piece, Alligator, Turtle, Tree, Boat, Goal
+import heapq
+import math
+import random
+
+from pieces import Alligator, Turtle, Tree, Boat, Goal
+from action import Action
+from point import Point
+import directions
 
 # used to print things to console all pretty like
 _str_mapping = {
@@ -10,6 +17,9 @@ _str_mapping = {
     Goal: " G"
 }
 
+# seed for the random Zobrist keys, so hashes are the same between runs
+_zobrist_seed = 5400
+
 # used to represent a direction by an arrow, cause it's easier to understand
 _str_arrow = {
     'U': '^',
@@ -19,10 +29,80 @@ _str_arrow = {
 }
 
 
+def _pose(piece):
+    """Gets the pose of a piece, which is what the move tables are keyed by
+
+    Returns:
+        tuple: (class, x, y, orientation) of the piece
+    """
+    return (piece.__class__, piece.pivot.x, piece.pivot.y, piece.orientation)
+
+
+def _place(piece, pose):
+    """Puts a piece in a pose (see `_pose()`)
+    """
+    piece.pivot.move_to(pose[1], pose[2])
+    piece.orientation = pose[3]
+
+
+class _Puzzle():
+    """The parts of a puzzle that never change from its file, and the tables
+    built from them once. One is shared by every Board of the same puzzle, so
+    none of this is stored per board
+    """
+    __slots__ = [
+        'width', 'height',
+        'radiation_source', 'radition_magnitude', 'radition_decay',
+        'trees', 'goal',
+        # see `Board._build_radiation()`
+        'radiation', 'pose_radiation',
+        # the move tables, see `Board._build_moves()`
+        'moves', 'goal_mask',
+        # the random keys of each piece placement, see `Board._build_zobrist()`
+        'zobrist_keys',
+        # the boat's cost to the goal from each pose, see
+        # `Board._build_boat_costs()`
+        'boat_costs',
+    ]
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+
+def _puzzle_property(name):
+    """Makes a property of Board that gets/sets a member of its `_Puzzle`, so
+    a Board still reads like it has its own width, trees, etc.
+    """
+    def get(self):
+        return getattr(self._puzzle, name)
+
+    def set(self, value):
+        setattr(self._puzzle, name, value)
+
+    return property(get, set)
+
+
 class Board():
     """Holds Pieces and represents a game state
+
+    A search can hold millions of these, so they use `__slots__` and only
+    have what changes between states. Everything else is in the `_Puzzle`
+    they share
     """
-    _id = 0
+    __slots__ = [
+        '_puzzle', 'parent_action', 'depth',
+        'alligators', 'turtles', 'boat',
+        '_occupied', 'zobrist', 'key',
+    ]
+
+    width = _puzzle_property('width')
+    height = _puzzle_property('height')
+    radiation_source = _puzzle_property('radiation_source')
+    radition_magnitude = _puzzle_property('radition_magnitude')
+    radition_decay = _puzzle_property('radition_decay')
+    trees = _puzzle_property('trees')
+    goal = _puzzle_property('goal')
 
     def __init__(self, action=None):
         """Creates a new board. Passing an action assumes this is a Board state
@@ -32,90 +112,93 @@ class Board():
             action (Optional[Action]): the action that this state is derived
             from
         """
-        self._id = Board._id
         self.parent_action = None
-        self.parent_board = None
-        self.ancestors_str = ''
         self.depth = 0
 
-        Board._id += 1
-        self.width = None
-        self.height = None
-
-        self.radiation_source = None
-        self.radition_magnitude = None
-        self.radition_decay = None
-
         self.alligators = None
         self.turtles = None
-        self.trees = None
-
         self.boat = None
 
-        self.goal = None
-
         if action:
             self._apply_action(action)
+        else:
+            self._puzzle = _Puzzle()
 
     def _apply_action(self, action):
-        """Applies an action, this deriving this board from it (cloning it and
-        updating based on action)
+        """Applies an action, this deriving this board from it. Only the piece
+        the action moves (and the boat, as its radiation changes) are cloned,
+        every other piece is shared with the parent board, and the occupied
+        bitboard is only updated at the cells the moved piece left and entered
 
         Args:
             action (Action): The action to apply and clone from
         """
-        self._clone_from(action.board)
+        parent = action.board
+        self._share_from(parent)
 
-        self.depth += 1
-        self.parent_board = action.board
+        self.depth = parent.depth + 1
         self.parent_action = action
 
-        a = self.parent_action
-        ancestors = []
-        while a:
-            ancestors.insert(0, a.str_formatted())
-            a = a.board.parent_action
-
-        self.ancestors_str = ','.join(ancestors)
+        # look up where the move takes the piece, rather than doing it
+        cells, pose = self._moved(action.piece, action.method)
+        piece = self._own_piece(action.piece)
+        _place(piece, pose)
+        self._occupied = self._occupied & ~cells | \
+            self._puzzle.moves[pose][0]
 
-        if action.piece_name == "Boat":
-            piece = self.boat
-        else:
-            pieces = self.alligators \
-                if action.piece_name == "Alligator" else self.turtles
-            piece = pieces[action.piece_index]
+        # XOR the piece out of where it was, and into where it is now
+        self.zobrist ^= self._placement_key(action.piece) ^ \
+            self._placement_key(piece)
 
-        # invoke the method of that piece via reflection
-        getattr(piece, action.method)()
+        if piece is not self.boat:
+            # the boat's radiation is about to change, so we need our own
+            self._own_piece(self.boat)
 
         if not self.is_boat_at_goal():
-            self.boat.radiate()
+            self.boat.radiate(self)
 
-        self.update()
+        self._generate_key()
 
-    def _clone_from(self, original):
-        """Clones all internal [public] members from an original board to this
+    def _share_from(self, original):
+        """Shares all the members of an original board with this one. Nothing
+        is copied, so anything that needs to change must be copied on write
+        (see `_own_piece()`)
 
         Args:
-            original (Board): the original board that we need to copy all data
-            from. Note: new Piece instances are created instead of justing
-            creating a shallow copied
+            original (Board): the original board that we are derived from
         """
-        for member in dir(original):
-            if callable(getattr(original, member)) or member.startswith("_"):
-                continue
+        # this never changes from the puzzle file
+        self._puzzle = original._puzzle
+
+        # these are copied on write
+        self.alligators = original.alligators
+        self.turtles = original.turtles
+        self.boat = original.boat
+        self._occupied = original._occupied
+        self.zobrist = original.zobrist
 
-            val = getattr(original, member)
-            clone = val
+    def _own_piece(self, piece):
+        """Replaces a piece shared with the parent board with a clone only this
+        board owns, so it can be changed
+
+        Args:
+            piece (Piece): the shared piece (the boat, an alligator or turtle)
+
+        Returns:
+            Piece: the clone of the piece that now is part of this board
+        """
+        clone = piece.clone()
 
-            if isinstance(val, list):
-                clone = [item.clone(board=self) for item in val]
-            elif isinstance(val, Piece):
-                clone = val.clone(board=self)
-            # else it's some primitive like a number
+        if isinstance(piece, Boat):
+            self.boat = clone
+        elif isinstance(piece, Alligator):
+            self.alligators = list(self.alligators)
+            self.alligators[piece.index] = clone
+        else:  # Turtle
+            self.turtles = list(self.turtles)
+            self.turtles[piece.index] = clone
 
-            # set that member to us via reflection
-            setattr(self, member, clone)
+        return clone
 
     def _parse(self, contents):
         """Parsed the contents of a file to a board state
@@ -155,7 +238,6 @@ class Board():
                 # we are recoding alligators
                 index = self.alligators.index(None)
                 self.alligators[index] = Alligator(
-                    board=self,
                     index=index,
                     x=first,
                     y=second,
@@ -165,7 +247,6 @@ class Board():
                 # we are recording turtles
                 index = self.turtles.index(None)
                 self.turtles[index] = Turtle(
-                    board=self,
                     index=index,
                     x=first,
                     y=second,
@@ -175,7 +256,6 @@ class Board():
                 # we are recoding trees
                 index = self.trees.index(None)
                 self.trees[index] = Tree(
-                    board=self,
                     index=index,
                     x=first,
                     y=second
@@ -183,7 +263,6 @@ class Board():
             elif self.boat is None:
                 # second to last line, the boat
                 self.boat = Boat(
-                    board=self,
                     x=first,
                     y=second,
                     orientation=third
@@ -191,7 +270,6 @@ class Board():
             elif self.goal is None:
                 # last line, the goal point
                 self.goal = Goal(
-                    board=self,
                     x=first,
                     y=second
                 )
@@ -199,26 +277,346 @@ class Board():
 
     def update(self):
         """Called or needs to be called after something internally changes.
-        Should be called after being filled from the file formatter or from
-        within after cloning Pieces
+        Should be called after being filled from the file formatter. Boards
+        derived via an action update their grid themselves, cell by cell
         """
 
-        # store all the "things" on the board in one handy list
-        self._pieces = [self.boat, self.goal] + self.alligators + \
-            self.turtles + self.trees
+        puzzle = self._puzzle
+        if puzzle.radiation is None:
+            self._build_radiation()
 
-        self._grid = []
+        if puzzle.moves is None:
+            self._build_moves()
+
+        if puzzle.zobrist_keys is None:
+            self._build_zobrist()
+
+        if puzzle.boat_costs is None:
+            self._build_boat_costs()
+
+        # bitboard of the grid, with the bit `x * height + y` set for each
+        # cell that something is in. There is no grid of the pieces, see
+        # `at()`
+        # the cells of the pieces that can move are in the move tables
+        self._occupied = 0
+        for piece in self._pieces():
+            entry = puzzle.moves.get(_pose(piece))
+            self._occupied |= entry[0] if entry is not None else \
+                self._cells_mask(piece.cells())
+
+        self.zobrist = 0
+        for piece in [self.boat] + self.alligators + self.turtles:
+            self.zobrist ^= self._placement_key(piece)
+
+        self._generate_key()
+
+    def _build_radiation(self):
+        """Builds the radiation field of the puzzle, which never changes, so
+        it is built once and shared by all boards derived from this one.
+
+        `radiation` is a flat list of the radiation at each cell (indexed by
+        `x * height + y`), and `pose_radiation` maps each pose the boat can
+        be in as (x, y, orientation) to the radiation at its pivot and front
+        """
+        puzzle = self._puzzle
+        puzzle.radiation = []
         for x in range(self.width):
-            self._grid.append([])
             for y in range(self.height):
-                self._grid[x].append(None)
+                d = abs(self.radiation_source.x - x) + \
+                    abs(self.radiation_source.y - y)
+                puzzle.radiation.append(
+                    max(0, self.radition_magnitude - (d*self.radition_decay))
+                )
 
-                for obj in self._pieces:
-                    if obj.at(x, y) and obj is not self.goal:
-                        self._grid[x][y] = obj
-                        break
+        puzzle.pose_radiation = {}
+        for x in range(self.width):
+            for y in range(self.height):
+                for orientation in ['U', 'R', 'D', 'L']:
+                    front = directions.offset(Point(x, y), orientation)
+                    if 0 <= front.x < self.width and \
+                            0 <= front.y < self.height:
+                        puzzle.pose_radiation[(x, y, orientation)] = max(
+                            0,
+                            self.radiation_at(x, y) + self.radiation_at(front)
+                        )
+
+    def _build_moves(self):
+        """Builds the move tables of the puzzle, so no geometry is done while
+        searching. For every pose (class, pivot and orientation) a piece that
+        can move could be in, `moves` has the mask of the cells it covers, and
+        for each of its moves that stays on the board the mask of the cells
+        the move needs to be empty and the pose it ends up in. Then finding
+        the valid moves of a piece is just one AND against the occupied
+        bitboard per move, see `actions_of()`
+        """
+        # the boat can rotate, but alligators and turtles never change the
+        # orientation they started in
+        orientations = {Boat: {'U', 'R', 'D', 'L'}}
+        for piece in self.alligators + self.turtles:
+            orientations.setdefault(piece.__class__, set()).add(
+                piece.orientation
+            )
+
+        moves = self._puzzle.moves = {}
+        for kind, kind_orientations in orientations.items():
+            for orientation in kind_orientations:
+                for x in range(self.width):
+                    for y in range(self.height):
+                        piece = kind(x=x, y=y, orientation=orientation)
+                        cells = self._cells_mask(piece.cells())
+                        if cells is None:
+                            continue  # it can't be here, it'd be off the board
+
+                        piece_moves = []
+                        for method, swept in piece.sweeps():
+                            swept_mask = self._cells_mask(swept)
+                            if swept_mask is None:
+                                continue  # it would leave the board
+
+                            moved = piece.clone()
+                            getattr(moved, method)()
+                            piece_moves.append(
+                                (method, swept_mask, _pose(moved))
+                            )
+
+                        moves[_pose(piece)] = (cells, tuple(piece_moves))
+
+        self._puzzle.goal_mask = self._cells_mask(self.goal.cells())
+
+    def _cells_mask(self, points):
+        """Gets the mask of cells in the occupied bitboard (see `update()`)
+
+        Args:
+            points (list[Point]): the cells
+
+        Returns:
+            int: the mask, or None if any of the cells are off the board
+        """
+        mask = 0
+        for point in points:
+            if point.x < 0 or point.y < 0 or \
+                    point.x >= self.width or point.y >= self.height:
+                return None  # Out of Bounds
+            mask |= 1 << (point.x * self.height + point.y)
+        return mask
+
+    def _moved(self, piece, method):
+        """Looks up a move of a piece in the move tables
 
-        self._generate_str_id()
+        Args:
+            piece (Piece): the piece (the boat, an alligator or turtle)
+            method (str): the method name of the move
+
+        Returns:
+            tuple: (cells, pose), the mask of the cells the piece covers now,
+            and the pose (see `_pose()`) the move takes it to
+
+        Raises:
+            ValueError: if the move would take the piece off the board
+        """
+        cells, moves = self._puzzle.moves[_pose(piece)]
+        for move, _, pose in moves:
+            if move == method:
+                return cells, pose
+
+        raise ValueError('{} can not {} off the board'.format(piece, method))
+
+    def _build_zobrist(self):
+        """Builds the random 64 bit keys for every placement (cell and
+        orientation) of every piece that can move. The Zobrist hash of a
+        board is all the keys of its pieces' placements XORed together, so
+        when a piece moves the hash is updated by XORing its old placement
+        out and its new one in
+        """
+        rng = random.Random(_zobrist_seed)
+        zobrist_keys = self._puzzle.zobrist_keys = {}
+
+        for piece in [self.boat] + self.alligators + self.turtles:
+            # only the boat can change its orientation
+            orientations = ['U', 'R', 'D', 'L'] \
+                if piece is self.boat else [piece.orientation]
+            for x in range(self.width):
+                for y in range(self.height):
+                    for orientation in orientations:
+                        zobrist_keys[(
+                            piece.__class__.__name__, piece.index,
+                            x, y, orientation
+                        )] = rng.getrandbits(64)
+
+    def _build_boat_costs(self):
+        """Builds the least radiation the boat would take to reach the goal
+        from each of its poses (pivot and orientation), if the only things on
+        the board were the trees. This is a Dijkstra search backward from the
+        poses at the goal, over the moves the boat could make
+        """
+        trees = 0
+        for tree in self.trees:
+            trees |= self._cells_mask(tree.cells())
+
+        # the poses each pose can be reached from with one boat move, as
+        # (x, y, orientation) like `pose_radiation`
+        came_from = {}
+        goal_poses = []
+        for (kind, x, y, orientation), (cells, moves) in \
+                self._puzzle.moves.items():
+            if kind is not Boat or cells & trees:
+                continue
+
+            pose = (x, y, orientation)
+            came_from.setdefault(pose, [])
+            if cells & self._puzzle.goal_mask:
+                goal_poses.append(pose)
+
+            for _, swept, moved in moves:
+                if not swept & trees:
+                    came_from.setdefault(moved[1:], []).append(pose)
+
+        # moving into a pose costs its radiation, unless it is at the goal
+        # (see `_apply_action()`)
+        boat_costs = self._puzzle.boat_costs = {}
+        fringe = [(0, pose) for pose in goal_poses]
+        while fringe:
+            cost, pose = heapq.heappop(fringe)
+            if pose in boat_costs:
+                continue  # already found a cheaper way from here
+
+            boat_costs[pose] = cost
+            if pose not in goal_poses:
+                cost += self._puzzle.pose_radiation[pose]
+
+            for previous in came_from[pose]:
+                if previous not in boat_costs:
+                    heapq.heappush(fringe, (cost, previous))
+
+    def _placement_key(self, piece):
+        """Gets the Zobrist key for where a piece is
+
+        Args:
+            piece (Piece): the boat, an alligator or a turtle
+
+        Returns:
+            int: the random 64 bit key of the piece's placement
+        """
+        return self._puzzle.zobrist_keys[(
+            piece.__class__.__name__, piece.index,
+            piece.pivot.x, piece.pivot.y, piece.orientation
+        )]
+
+    def from_key(self, key, radiation=0):
+        """Creates a new Board in the state of a key (see `_generate_key()`)
+        that shares all the static data (trees, goal, etc) of this Board.
+        The new Board has no parent.
+
+        Args:
+            key (tuple): the key of the state to create the board in
+            radiation (Optional[int]): the radiation the boat has taken
+
+        Returns:
+            Board: a new board in the state of key
+        """
+        board = self.__class__()
+        board._share_from(self)
+
+        board.boat = Boat(x=key[0], y=key[1], orientation=key[2])
+        board.boat.radiation = radiation
+
+        i = 3
+        board.alligators = []
+        for alligator in self.alligators:
+            board.alligators.append(Alligator(
+                index=alligator.index,
+                x=key[i],
+                y=key[i + 1],
+                orientation=alligator.orientation
+            ))
+            i += 2
+
+        board.turtles = []
+        for turtle in self.turtles:
+            board.turtles.append(Turtle(
+                index=turtle.index,
+                x=key[i],
+                y=key[i + 1],
+                orientation=turtle.orientation
+            ))
+            i += 2
+
+        board.update()
+
+        return board
+
+    def piece(self, piece_name, index=None):
+        """Gets a movable piece by its class name and index
+
+        Args:
+            piece_name (str): 'Boat', 'Alligator' or 'Turtle'
+            index (Optional[int]): the index of the alligator or turtle
+
+        Returns:
+            Piece: the piece on this board
+        """
+        if piece_name == "Boat":
+            return self.boat
+        if piece_name == "Alligator":
+            return self.alligators[index]
+        return self.turtles[index]
+
+    @property
+    def parent_board(self):
+        """Board: the board this one was derived from, or None for the root.
+        It is not stored, as the action already references it
+        """
+        if self.parent_action is None:
+            return None
+        return self.parent_action.board
+
+    def _pieces(self):
+        """Gets all the "things" on the board in one handy list, except the
+        goal as it can be covered by other pieces
+
+        Returns:
+            list[Piece]: the boat, alligators, turtles and trees
+        """
+        return [self.boat] + self.alligators + self.turtles + self.trees
+
+    def path(self):
+        """Follows the parent boards back to the root board. The chain of
+        parent boards/actions is the only record of how this board was
+        reached, it is shared with every other board derived from the same
+        parents, and is only turned into a list (or solution text) here
+
+        Returns:
+            list[Board]: the path of boards, starting with the child of the
+            root board and ending with this board
+        """
+        path = []
+        board = self
+        while board.parent_board is not None:
+            path.append(board)
+            board = board.parent_board
+
+        path.reverse()
+        return path
+
+    def follow(self, moves):
+        """Applies moves one after another starting from this board, and
+        collects the boards that results in
+
+        Args:
+            moves (list[tuple]): compact actions (see `Action.to_tuple()`)
+
+        Returns:
+            list[Board]: the path of boards, starting with the child of this
+            board and ending with the board after the last move
+        """
+        path = []
+        board = self
+        for piece_name, index, method in moves:
+            board = Action(board, board.piece(piece_name, index), method) \
+                .generate()
+            path.append(board)
+
+        return path
 
     def at(self, x, y=None):
         """Determine what (if anything) is at passed in coordinate or Point
@@ -239,21 +637,125 @@ class Board():
             x = x.x
         if x < 0 or y < 0 or x >= self.width or y >= self.height:
             return "Out of Bounds"
-        return self._grid[x][y]
+        if not self._occupied >> (x * self.height + y) & 1:
+            return None
+
+        # boards do not keep a grid of their pieces, as it would need copying
+        # for every child, so look for it. The searches never need this
+        for piece in self._pieces():
+            if piece.at(x, y):
+                return piece
+        return None
+
+    def actions_of(self, piece):
+        """Gets the valid actions of a piece. Which cells each of its moves
+        needs to be empty only depends on the piece's class, pivot and
+        orientation, so they are looked up in the move tables (see
+        `_build_moves()`), and each move is just one AND against the occupied
+        bitboard
 
-    def radiation_at(self, point):
+        Args:
+            piece (Piece): the boat, an alligator or turtle of this board
+
+        Returns:
+            list[Action]: the actions of the piece that can be done
+        """
+        occupied = self._occupied
+        return [
+            Action(self, piece, method)
+            for method, swept, _ in self._puzzle.moves[_pose(piece)][1]
+            if not occupied & swept
+        ]
+
+    def could_come_from(self, piece, method):
+        """Checks if one of this board's pieces could have got where it is by
+        a move from somewhere else, with everything else where it is now.
+        Like `actions_of()` this is just lookups in the move tables
+
+        Args:
+            piece (Piece): the piece (the boat, an alligator or turtle) where
+                it was before the move, which is not on this board
+            method (str): the method name of the move
+
+        Returns:
+            bool: True if the piece fit there and the move leads here
+        """
+        moves = self._puzzle.moves
+        if _pose(piece) not in moves:
+            return False  # it would have been off the board
+
+        now = _pose(self.piece(piece.__class__.__name__, piece.index))
+        others = self._occupied & ~moves[now][0]
+
+        cells, piece_moves = moves[_pose(piece)]
+        return not cells & others and any(
+            move == method and pose == now and not swept & others
+            for move, swept, pose in piece_moves
+        )
+
+    def radiation_at(self, x, y=None):
         """Gets the amount of radiation present at a given point on the grid
 
         Args:
-            point (Point): the point in the grid to check, must lie within the
-            width/height of the board
+            x (int, Point): the x coordinate, or the actual Point instance.
+                Must lie within the width/height of the board
+            y (Optional[int]): the y coordinate if x was not the Point
 
         Returns:
             int: an integer >= 0 representing how much radiation that will be
             incurred at the given point
         """
-        d = self.radiation_source.manhattan_distance_to(point)
-        return max(0, self.radition_magnitude - (d*self.radition_decay))
+        if y is None:
+            # x is a point
+            y = x.y
+            x = x.x
+        puzzle = self._puzzle
+        return puzzle.radiation[x * puzzle.height + y]
+
+    def boat_cost_to_goal(self, boat=None):
+        """Gets the least radiation the boat could take to reach the goal from
+        where it is now, ignoring the alligators and turtles
+
+        Args:
+            boat (Optional[Boat]): the boat somewhere else, e.g. from
+                `preview()`, defaults to this board's boat
+
+        Returns:
+            number: the radiation, or infinity if the trees make it impossible
+        """
+        if boat is None:
+            boat = self.boat
+        return self._puzzle.boat_costs.get(
+            (boat.pivot.x, boat.pivot.y, boat.orientation), math.inf
+        )
+
+    def pose_radiation(self, pivot, orientation):
+        """Gets the amount of radiation the boat takes in a given pose
+
+        Args:
+            pivot (Point): where the boat's pivot is
+            orientation (str): the direction the boat is facing
+
+        Returns:
+            int: an integer >= 0 representing how much radiation the boat
+            will take at its pivot and front together
+        """
+        return self._puzzle.pose_radiation[(pivot.x, pivot.y, orientation)]
+
+    def successors(self):
+        """Generates the valid Actions that this Board state can perform, one
+        at a time, so a search that stops early never finds the rest
+
+        Yields:
+            Action: each valid action this Board state can perform (none will
+            have been applied to anything however)
+        """
+        # trees and the goal never have actions
+        yield from self.boat.get_actions(self)
+        for piece in self.alligators:
+            yield from piece.get_actions(self)
+        for piece in self.turtles:
+            yield from piece.get_actions(self)
 
     def get_valid_actions(self):
         """Gets a list of all valid Actions that this Board state can perform
@@ -263,24 +765,67 @@ class Board():
             can perform (none will have been applied to anything upon being
             returned from this function however)
         """
-        valid_actions = []
-        for piece in self._pieces:
-            valid_actions.extend(piece.get_actions())
-
-        return valid_actions
+        return list(self.successors())
 
     def generate_child_boards(self):
         """Use all the valid Actions that this Board state can do to generate
-        the child Boards and return them in a list
+        the child Boards, one at a time
+
+        Yields:
+            Board: each new Board that has applied a possible Action of this
+            board, and thus is a child of this Board. Use this to build the
+            state tree
+        """
+        for action in self.successors():
+            yield action.generate()
+
+    def preview(self, action):
+        """Works out the state an action would derive from this board, without
+        deriving it. Searches use this to score children they may never
+        expand, and only derive the ones they do (see `Action.generate()`)
+
+        Args:
+            action (Action): a valid action of this board
 
         Returns:
-            list[Board]: All new Boards that have applied the possible Actions
-            of this board, and thus are children of this Board. Use this to
-            build the state tree
+            tuple: (zobrist, radiation, boat, moved) of the board the action
+            derives, where zobrist is its hash, radiation what its boat will
+            have taken, boat its boat and moved its piece the action moved.
+            Those pieces belong to no board, and must not be changed
         """
-        return [
-            action.generate() for action in self.get_valid_actions()
-        ]
+        moved = action.piece.clone()
+        _place(moved, self._moved(action.piece, action.method)[1])
+
+        zobrist = self.zobrist ^ self._placement_key(action.piece) ^ \
+            self._placement_key(moved)
+
+        boat = moved if action.piece is self.boat else self.boat
+        radiation = self.boat.radiation
+        if not self._puzzle.moves[_pose(boat)][0] & self._puzzle.goal_mask:
+            radiation += self.pose_radiation(boat.pivot, boat.orientation)
+
+        return zobrist, radiation, boat, moved
+
+    def key_with(self, piece):
+        """Gets the key of this board with one of its pieces somewhere else
+
+        Args:
+            piece (Piece): the piece (the boat, an alligator or a turtle) where
+                it should be instead
+
+        Returns:
+            tuple: the key of the board with the piece moved
+        """
+        key = list(self.key)
+        if isinstance(piece, Boat):
+            key[0:3] = [piece.pivot.x, piece.pivot.y, piece.orientation]
+        else:
+            i = 3 + 2 * piece.index
+            if isinstance(piece, Turtle):
+                i += 2 * len(self.alligators)
+            key[i:i + 2] = [piece.pivot.x, piece.pivot.y]
+
+        return tuple(key)
 
     def is_boat_at_goal(self):
         """Checks if at this Board state the Boat is at the Goal point
@@ -288,18 +833,38 @@ class Board():
         Returns:
             bool: True if this is a goal state, False otherwise
         """
-        return self.boat.at(self.goal.pivot)
+        return bool(
+            self._puzzle.moves[_pose(self.boat)][0] & self._puzzle.goal_mask
+        )
+
+    def _generate_key(self):
+        """Generates the compact canonical key of this Board's state. Only the
+        pieces that can move are part of it, as everything else is the same
+        for every Board derived from the same puzzle. Radiation is not part of
+        the key, same as the ASCII art representation
+
+        The key is a flat tuple of the boat's pivot and orientation, followed
+        by the pivot of each alligator and then each turtle.
+        """
+        key = [self.boat.pivot.x, self.boat.pivot.y, self.boat.orientation]
+        for piece in self.alligators + self.turtles:
+            key.append(piece.pivot.x)
+            key.append(piece.pivot.y)
+
+        self.key = tuple(key)
 
-    def _generate_str_id(self):
-        """Generates a nifty ASCII art representation of the Board, that is also
-        unique (except for radiation) to be used as a quick ID for comparisons
+    @property
+    def str_id(self):
+        """Generates a nifty ASCII art representation of the Board. This used
+        to be the id of Boards for comparisons, now `key` is used for that and
+        this is only built when something wants to print the Board
 
         Returns:
             str: a string (with newlines) that shows what the Board looks like
         """
         lines = []
         for y in range(self.height):
-            line = []#self.ancestors_str]
+            line = []
             for x in range(self.width):
                 obj = self.at(x, y)
                 rep = _str_mapping[obj.__class__]
@@ -318,14 +883,10 @@ class Board():
                     else:
                         rep = rep.replace("@", _str_arrow[obj.orientation])
 
-                if isinstance(obj, Boat):
-                    # direction
-                    pass
-
                 # pad with 1 space so it looks better
                 line.append(rep)
             lines.append(" ".join(line))  # pad with a space for pretty-ness
-        self.str_id = "\n".join(lines)
+        return "\n".join(lines)
 
     def __str__(self):
         """string representation override
@@ -336,4 +897,4 @@ class Board():
         return self.str_id
 
     def __hash__(self):
-        return hash(self.str_id)
+        return self.zobrist
@@ -0,0 +1,229 @@
+"""An on-disk cache of solutions, so a puzzle that was already solved with an
+algorithm does not need to be searched again
+
+Entries are content-addressed: each is a JSON file named by the hash of the
+puzzle (as written by `formatter.file_from_board()`, so the same puzzle hashes
+the same however its file was laid out), the algorithm and the algorithm's
+parameters (see `search.parameters()`, e.g. ara_star's deadline). Writes are
+atomic, and a missing or broken entry is just a miss, so many processes (e.g.
+batch workers) can share a cache directory
+"""
+
+import hashlib
+import json
+import os
+import os.path
+import tempfile
+
+from formatter import file_from_board
+
+
+# bump when entries change in a way older code could not read
+_version = 2
+
+
+class SolutionCache():
+    """A directory of cached solutions, kept under a size limit by removing
+    the least recently used entries
+    """
+
+    def __init__(self, directory='./.cache/', max_bytes=64 * 1024 * 1024):
+        """Creates a cache using a directory, which is created when needed
+
+        Args:
+            directory (Optional[str]): the directory the entries are kept in
+            max_bytes (Optional[int]): how big the entries can get in total
+                before the least recently used are removed
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, puzzle, algorithm, parameters):
+        """Gets the file an entry would be in
+
+        Args:
+            puzzle (str): the puzzle, from `file_from_board()`
+            algorithm (str): the name of the search algorithm
+            parameters (dict): the parameters of the search algorithm
+
+        Returns:
+            str: the path of the entry's file
+        """
+        digest = hashlib.sha256('{}\n{}\n{}'.format(
+            algorithm, json.dumps(parameters, sort_keys=True), puzzle
+        ).encode('utf-8')).hexdigest()
+
+        # split into sub directories so no one directory gets too big
+        return os.path.join(self.directory, digest[:2], digest + '.json')
+
+    def get(self, board, algorithm, parameters=None):
+        """Gets the path to the goal cached for a board and algorithm with
+        the same parameters. The cached moves are replayed and checked to be
+        valid moves that reach the goal with the radiation they had, else it
+        is a miss
+
+        Args:
+            board (Board): the initial board
+            algorithm (str): the name of the search algorithm
+            parameters (Optional[dict]): the parameters of the search
+                algorithm, see `search.parameters()`
+
+        Returns:
+            tuple: (path, entry), where path is the list of boards to the goal
+            and entry the dict that was cached, or None if nothing valid was
+        """
+        parameters = parameters or {}
+        puzzle = file_from_board(board)
+        entry_path = self._entry_path(puzzle, algorithm, parameters)
+
+        try:
+            with open(entry_path, 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None  # not cached (or broken, which is as good as not)
+
+        if entry.get('version') != _version or \
+                entry.get('puzzle') != puzzle or \
+                entry.get('algorithm') != algorithm or \
+                entry.get('parameters') != _normalize(parameters):
+            return None
+
+        path = _replay(board, entry['moves'])
+        if path is None or \
+                (path[-1].boat.radiation if path else 0) != entry['radiation']:
+            # never trust a bad entry again
+            _remove(entry_path)
+            return None
+
+        # mark it as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return path, entry
+
+    def put(self, board, algorithm, path, stats=None, parameters=None,
+            time_elapsed=None):
+        """Caches the path found from a board by an algorithm, then removes
+        the least recently used entries if the cache got too big
+
+        Args:
+            board (Board): the initial board
+            algorithm (str): the name of the search algorithm
+            path (list[Board]): the path to the goal that was found
+            stats (Optional[dict]): stats about the search to keep with it
+            parameters (Optional[dict]): the parameters of the search
+                algorithm, see `search.parameters()`
+            time_elapsed (Optional[int]): how long the search took, in
+                MICROseconds
+        """
+        parameters = parameters or {}
+        puzzle = file_from_board(board)
+        entry_path = self._entry_path(puzzle, algorithm, parameters)
+
+        entry = {
+            'version': _version,
+            'puzzle': puzzle,
+            'algorithm': algorithm,
+            'parameters': _normalize(parameters),
+            'moves': [step.parent_action.to_tuple() for step in path],
+            'radiation': path[-1].boat.radiation if path else 0,
+            'length': len(path),
+            'stats': stats,
+            'time': time_elapsed,
+        }
+
+        entry_dir = os.path.dirname(entry_path)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        # write it to a temporary file beside it, then move it into place all
+        # at once, so no one can read half an entry
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=entry_dir, suffix='.tmp'
+        )
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                json.dump(entry, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, entry_path)
+        except BaseException:
+            _remove(temporary_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries till the cache is within
+        its size limit
+        """
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                entry_path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue  # removed by someone else
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+                total += stat.st_size
+
+        entries.sort()
+        for mtime, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(entry_path)
+            total -= size
+
+
+def _replay(board, moves):
+    """Replays moves from a board, checking each is a valid action
+
+    Args:
+        board (Board): the board to start from
+        moves (list): compact actions (see `Action.to_tuple()`), as lists
+            once loaded from JSON
+
+    Returns:
+        list[Board]: the path of boards if every move was valid and it ends
+        at the goal, otherwise None
+    """
+    path = []
+    current = board
+    for move in moves:
+        move = tuple(move)
+        for action in current.get_valid_actions():
+            if action.to_tuple() == move:
+                current = action.generate()
+                break
+        else:
+            return None  # not a valid move from here
+        path.append(current)
+
+    if not current.is_boat_at_goal():
+        return None
+
+    return path
+
+
+def _normalize(parameters):
+    """Gets parameters as they are once dumped to and loaded from JSON (e.g.
+    tuples become lists), so they can be compared to ones that were
+
+    Returns:
+        dict: the parameters
+    """
+    return json.loads(json.dumps(parameters))
+
+
+def _remove(path):
+    """Removes a file, if someone else has not already
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
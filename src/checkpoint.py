@@ -0,0 +1,332 @@
+"""Checkpoints of a search's state on disk, so a long search that is killed
+can be resumed rather than started over
+
+A checkpoint file is a header followed by segments. Each segment holds what
+changed since the segment before it: states that were reached more cheaply
+(as their compact key, g, depth, and how they were reached) and states that
+were closed, along with the stats of the search so far (its elapsed time,
+counts and max depth) so they carry on from there when it is resumed.
+Searches only append those changes to an in-memory journal as they go, and
+a background thread writes them out, so checkpointing never stalls the
+search for more than swapping the journal out. Each segment has a checksum,
+so one torn by the process being killed is ignored
+"""
+
+import array
+import hashlib
+import os
+import os.path
+import struct
+import tempfile
+import threading
+from time import time
+import zlib
+
+from formatter import file_from_board
+
+
+_magic = b'BOATCKPT'
+# bump when the file layout changes, older checkpoints can't be resumed
+_version = 2
+
+# magic, version, length of state keys, and hash of the puzzle
+_header = struct.Struct('<8sHH32s')
+# length of the payload, its crc32, how many states and closed states in it
+_segment = struct.Struct('<IIII')
+# the stats of the search when the segment was saved, at the payload's start:
+# seconds elapsed, expanded, generated, duplicates and max depth
+_stats = struct.Struct('<dqqqq')
+_stat_names = ['elapsed', 'expanded', 'generated', 'duplicates', 'max_depth']
+
+_orientations = 'URDL'
+_pieces = ['Boat', 'Alligator', 'Turtle']
+_methods = ['move_forward', 'move_backward', 'rotate_clockwise',
+            'rotate_counter_clockwise']
+
+
+class Checkpoint():
+    """Saves the state of a search to a file every so often
+    """
+
+    def __init__(self, path, start, interval=60.0, resume=False):
+        """Creates a checkpoint for a search from a board
+
+        Args:
+            path (str): the file to save checkpoints to
+            start (Board): the board the search started from
+            interval (Optional[number]): seconds between checkpoints
+            resume (Optional[bool]): if the search should resume from the
+                file when it exists, else it is started over
+        """
+        self.path = path
+        self.start = start
+        self.interval = interval
+        self.resume = resume
+
+        self._puzzle_hash = hashlib.sha256(
+            file_from_board(start).encode('utf-8')
+        ).digest()
+        self._key_length = len(start.key)
+
+        # changes since the last checkpoint, swapped out when saving
+        self._reached = []
+        self._closed = []
+
+        self._last = time()
+        self._writer = None
+        self._started = False
+
+    def reached(self, state, key, g, depth, parent, move):
+        """Records that a state was reached more cheaply than before
+
+        Args:
+            state (int): the id of the state
+            key (tuple): the key of the state
+            g (int): the cost to reach it
+            depth (int): how many actions it is from the start
+            parent (int): the id of the state it was reached from, or None for
+                the start
+            move (tuple): the compact action it was reached by, or None
+        """
+        self._reached.append((state, key, g, depth, parent, move))
+
+    def closed(self, state):
+        """Records that a state was closed (expanded)
+
+        Args:
+            state (int): the id of the state
+        """
+        self._closed.append(state)
+
+    def load(self):
+        """Loads the state of the search from the file, if resuming. The file
+        is re-written to hold just that state in one segment, which also
+        drops any torn segment at its end
+
+        Returns:
+            tuple: (states, closed, stats), where states maps the id of every
+            state reached to (key, g, depth, (parent id, compact action) or
+            None), closed is the set of ids of the states closed, and stats
+            the stats of the search when it was last saved (a dict of
+            `_stat_names`). None if there is nothing to resume, in which case
+            the search starts over
+        """
+        if not self.resume or not os.path.exists(self.path):
+            return None
+
+        states = {}
+        closed = set()
+        stats = dict.fromkeys(_stat_names, 0)
+        with open(self.path, 'rb') as file:
+            self._read_header(file)
+
+            while True:
+                segment = _read_segment(file, self._key_length)
+                if segment is None:
+                    break  # the end, or torn while being written
+
+                for state, key, g, depth, parent, move in segment[0]:
+                    states[state] = (
+                        key, g, depth, None if move is None else (parent, move)
+                    )
+                closed.update(segment[1])
+                stats = segment[2]
+
+        self._write_file(
+            [(state, key, g, depth) + (value or (None, None))
+             for state, (key, g, depth, value) in states.items()],
+            list(closed), stats
+        )
+
+        return states, closed, stats
+
+    def _read_header(self, file):
+        """Reads and checks the header of a checkpoint file
+
+        Raises:
+            Exception: if the file is not a checkpoint of this puzzle that
+                this version can read
+        """
+        header = file.read(_header.size)
+        if len(header) != _header.size:
+            raise Exception('`{}` is not a checkpoint'.format(self.path))
+
+        magic, version, key_length, puzzle_hash = _header.unpack(header)
+        if magic != _magic:
+            raise Exception('`{}` is not a checkpoint'.format(self.path))
+        if version != _version:
+            raise Exception(
+                'Checkpoint `{}` is version {}, but only version {} can be '
+                'resumed'.format(self.path, version, _version)
+            )
+        if key_length != self._key_length or puzzle_hash != self._puzzle_hash:
+            raise Exception(
+                'Checkpoint `{}` is of a different puzzle'.format(self.path)
+            )
+
+    def _write_file(self, reached, closed, stats):
+        """Writes a whole new checkpoint file (atomically), with one segment
+        """
+        directory = os.path.dirname(self.path) or '.'
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=directory, suffix='.tmp'
+        )
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(_header.pack(_magic, _version, self._key_length,
+                                        self._puzzle_hash))
+                file.write(_pack_segment(reached, closed, self._key_length,
+                                         stats))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        self._started = True
+
+    def maybe_save(self, stats):
+        """Saves the changes since the last checkpoint in the background, if
+        it has been `interval` seconds since then and the last one is done
+        being written
+
+        Args:
+            stats (SearchStats): the stats of the search so far, saved along
+                with the changes
+        """
+        now = time()
+        if now - self._last < self.interval or \
+                (self._writer and self._writer.is_alive()):
+            return
+
+        self._last = now
+        snapshot = {
+            'elapsed': now - stats.started,
+            'expanded': stats.expanded,
+            'generated': stats.generated,
+            'duplicates': stats.duplicates,
+            'max_depth': stats.max_depth,
+        }
+        self._writer = threading.Thread(
+            target=self._save, args=(self._reached, self._closed, snapshot),
+            daemon=True
+        )
+        self._reached = []
+        self._closed = []
+        self._writer.start()
+
+    def _save(self, reached, closed, stats):
+        """Writes changes to the file, run on the writer thread
+        """
+        if not self._started:
+            # the first checkpoint of a search that was not resumed
+            self._write_file(reached, closed, stats)
+            return
+
+        with open(self.path, 'ab') as file:
+            file.write(_pack_segment(reached, closed, self._key_length,
+                                     stats))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def finish(self):
+        """Waits for the checkpoint being written, then removes the file as
+        the search is over
+        """
+        if self._writer:
+            self._writer.join()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _pack_segment(reached, closed, key_length, stats):
+    """Packs states into a segment of a checkpoint file
+
+    Args:
+        reached (list[tuple]): the states reached, as (id, key, g, depth,
+            parent id, compact action)
+        closed (list[int]): the ids of the states closed
+        key_length (int): how many values are in each key
+        stats (dict): the stats of the search so far, of `_stat_names`
+
+    Returns:
+        bytes: the segment
+    """
+    ids = array.array('Q')
+    values = array.array('q')
+    for state, key, g, depth, parent, move in reached:
+        ids.append(state)
+        ids.append(parent or 0)
+
+        values.extend(key[:2])
+        values.append(_orientations.index(key[2]))
+        values.extend(key[3:])
+        values.append(g)
+        values.append(depth)
+        if move is None:
+            values.extend((-1, -1, -1))
+        else:
+            values.append(_pieces.index(move[0]))
+            values.append(-1 if move[1] is None else move[1])
+            values.append(_methods.index(move[2]))
+
+    ids.extend(closed)
+
+    payload = zlib.compress(
+        _stats.pack(*(stats[name] for name in _stat_names)) +
+        ids.tobytes() + values.tobytes()
+    )
+    return _segment.pack(len(payload), zlib.crc32(payload), len(reached),
+                         len(closed)) + payload
+
+
+def _read_segment(file, key_length):
+    """Reads the next segment of a checkpoint file
+
+    Args:
+        file (file): the checkpoint file, opened in binary
+        key_length (int): how many values are in each key
+
+    Returns:
+        tuple: (reached, closed, stats) as given to `_pack_segment()`, or None
+        if there are no more whole segments
+    """
+    header = file.read(_segment.size)
+    if len(header) != _segment.size:
+        return None
+
+    length, crc, reached_count, closed_count = _segment.unpack(header)
+    payload = file.read(length)
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        return None
+
+    payload = zlib.decompress(payload)
+    stats = dict(zip(_stat_names, _stats.unpack_from(payload)))
+    payload = payload[_stats.size:]
+
+    ids = array.array('Q')
+    ids_size = (2 * reached_count + closed_count) * ids.itemsize
+    ids.frombytes(payload[:ids_size])
+    values = array.array('q')
+    values.frombytes(payload[ids_size:])
+
+    row = key_length + 5  # the key, g, depth and the 3 values of the move
+    reached = []
+    for i in range(reached_count):
+        v = values[i * row:(i + 1) * row]
+        key = (v[0], v[1], _orientations[v[2]]) + tuple(v[3:key_length])
+        g, depth = v[key_length:key_length + 2]
+        piece, index, method = v[key_length + 2:]
+        if piece == -1:
+            parent, move = None, None
+        else:
+            parent = ids[2 * i + 1]
+            move = (_pieces[piece], None if index == -1 else index,
+                    _methods[method])
+        reached.append((ids[2 * i], key, g, depth, parent, move))
+
+    closed = ids[2 * reached_count:]
+
+    return reached, closed, stats
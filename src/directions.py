@@ -21,7 +21,7 @@ def clockwise(direction):
         return "D"
     if direction == "D":
         return "L"
-    return "D"
+    return "U"
 
 
 def invert(direction):
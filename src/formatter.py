@@ -51,7 +51,6 @@ def board_from_file(file_contents):
         elif None in board.alligators:
             index = board.alligators.index(None)
             board.alligators[index] = Alligator(
-                board=board,
                 index=index,
                 x=first,
                 y=second,
@@ -63,7 +62,6 @@ def board_from_file(file_contents):
             # we are recording turtles
             index = board.turtles.index(None)
             board.turtles[index] = Turtle(
-                board=board,
                 index=index,
                 x=first,
                 y=second,
@@ -74,7 +72,6 @@ def board_from_file(file_contents):
         elif None in board.trees:
             index = board.trees.index(None)
             board.trees[index] = Tree(
-                board=board,
                 index=index,
                 x=first,
                 y=second
@@ -83,7 +80,6 @@ def board_from_file(file_contents):
         # second to last line, the boat
         elif board.boat is None:
             board.boat = Boat(
-                board=board,
                 x=first,
                 y=second,
                 orientation=third
@@ -92,7 +88,6 @@ def board_from_file(file_contents):
         # last line, the goal point
         elif board.goal is None:
             board.goal = Goal(
-                board=board,
                 x=first,
                 y=second
             )
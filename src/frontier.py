@@ -0,0 +1,366 @@
+"""Breadth first search that expands a whole layer of states at once with
+NumPy, rather than one Board at a time
+
+A layer (the frontier) is an array with a row per state, holding the state's
+key (see `Board._generate_key()`) with the boat's orientation as a number.
+Which moves are legal is worked out for every row at once, from tables built
+from the puzzle's move tables (see `Board._build_moves()`) that are indexed
+by each piece's pose. States are told apart by the same Zobrist hashes the
+Boards use, and duplicates are removed with `np.unique()` and `np.isin()`
+against the sorted array of every state seen, so by hash alone unless every
+child is verified against its key (see `search.verify_hashes`). No Boards
+are made till the path is found.
+
+NumPy is optional, it is only needed if this is used
+"""
+
+try:
+    import numpy as np
+except ImportError:  # only needed for this, so the rest works without it
+    np = None
+
+from pieces import Boat
+from stats import SearchStats
+
+
+# how many states of a layer are expanded at once, as the occupancy of each
+# state being expanded is held as a row of booleans
+chunk_size = 16384
+
+# the boat's orientations, in the order they are numbered in the frontier
+_orientations = 'URDL'
+
+
+class _PieceTables():
+    """The tables of one piece (the boat, an alligator or turtle) of a puzzle,
+    indexed by the piece's pose. For the boat the pose is
+    `(x * height + y) * 4 + orientation`, and for alligators and turtles
+    (which never turn) it is `x * height + y`
+    """
+
+    def __init__(self, board, piece, column):
+        """Builds the tables of a piece from a board's move tables
+
+        Args:
+            board (Board): a board of the puzzle, which has been updated
+            piece (Piece): the piece of that board
+            column (int): where the piece's pivot is in a state's key
+        """
+        self.piece = piece
+        self.column = column
+        self.is_boat = isinstance(piece, Boat)
+
+        height = board.height
+        cells = board.width * height
+        poses = cells * 4 if self.is_boat else cells
+
+        # the compact action of each move, in the order `successors()` gives
+        # them
+        self.moves = [
+            (piece.__class__.__name__, piece.index, method)
+            for method, _ in piece.sweeps()
+        ]
+
+        # what goes in the key for each pose
+        self.keys = np.zeros((poses, 3 if self.is_boat else 2), np.int16)
+        # the Zobrist key of each pose
+        self.zobrist = np.zeros(poses, np.uint64)
+        # the cells covered in each pose, `cells` is a cell that is never
+        # occupied, for padding
+        self.cells = np.full((poses, piece.length), cells, np.intp)
+        # for each move, if it can be done from each pose (else it leaves the
+        # board), the cells it sweeps in each pose, and the pose it ends in
+        self.legal = np.zeros((len(self.moves), poses), np.bool_)
+        self.swept = np.full((len(self.moves), poses, 2), cells, np.intp)
+        self.to = np.zeros((len(self.moves), poses), np.intp)
+
+        for (kind, x, y, orientation), (mask, moves) in \
+                board._puzzle.moves.items():
+            if kind is not piece.__class__ or \
+                    (not self.is_boat and orientation != piece.orientation):
+                continue
+
+            pose = self.pose(x, y, orientation, height)
+            self.keys[pose] = (x, y, _orientations.index(orientation)) \
+                if self.is_boat else (x, y)
+            self.zobrist[pose] = board._puzzle.zobrist_keys[(
+                kind.__name__, piece.index, x, y, orientation
+            )]
+            self.cells[pose] = _bits(mask)
+
+            for method, swept, moved in moves:
+                move = [move[2] for move in self.moves].index(method)
+                self.legal[move, pose] = True
+                self.swept[move, pose, :len(_bits(swept))] = _bits(swept)
+                self.to[move, pose] = self.pose(*moved[1:], height)
+
+    def pose(self, x, y, orientation, height):
+        """Gets the index of a pose in the tables
+
+        Returns:
+            int: the index
+        """
+        if self.is_boat:
+            return (x * height + y) * 4 + _orientations.index(orientation)
+        return x * height + y
+
+    def poses(self, states, height):
+        """Gets the pose of this piece in each state of a frontier
+
+        Args:
+            states (np.ndarray): the states, a row each
+            height (int): how many cells tall the puzzle is
+
+        Returns:
+            np.ndarray: the index of this piece's pose in each state
+        """
+        x = states[:, self.column].astype(np.intp)
+        y = states[:, self.column + 1].astype(np.intp)
+        if self.is_boat:
+            return (x * height + y) * 4 + states[:, 2]
+        return x * height + y
+
+
+def _contains(sorted_ids, ids):
+    """Gets which ids are in a sorted array of ids, by binary search so the
+    sorted array is not sorted again
+
+    Returns:
+        numpy.ndarray: a bool for each of ids, if it is in sorted_ids
+    """
+    found = np.zeros(len(ids), np.bool_)
+    at = np.searchsorted(sorted_ids, ids)
+    inside = at < len(sorted_ids)
+    found[inside] = sorted_ids[at[inside]] == ids[inside]
+    return found
+
+
+def _bits(mask):
+    """Gets the cells in a mask of the occupied bitboard
+
+    Returns:
+        list[int]: the index of each cell, as `x * height + y`
+    """
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells
+
+
+def bfgs(start, layer_stats=None, stats=None, verify=None):
+    """Breadth First Graph Search over whole layers at once. It finds the same
+    path as `search.bfgs()`, as children are kept in the same order
+
+    Args:
+        start (Board): the starting board
+        layer_stats (Optional[list]): if given a dict is appended to it for
+            each layer searched, like `search.bfs()`
+        stats (Optional[SearchStats]): updated as the search goes
+        verify (Optional[function]): if given, called with the hash and key
+            of the start and every child, to check no two keys share a hash,
+            as states are told apart by their hash alone. Slow, only for
+            verification
+
+    Returns:
+        list[Board]: the path of boards, starting with the child of the start
+        and ending at the goal, or None if there is no path
+
+    Raises:
+        Exception: if NumPy is not installed
+    """
+    if np is None:
+        raise Exception('NumPy is needed for this search, install it with '
+                        '`pip install numpy`')
+
+    if stats is None:
+        stats = SearchStats()
+
+    if start.is_boat_at_goal():
+        return []
+
+    height = start.height
+    cells = start.width * height
+
+    tables = [_PieceTables(start, start.boat, 0)]
+    for i, piece in enumerate(start.alligators + start.turtles):
+        tables.append(_PieceTables(start, piece, 3 + 2 * i))
+
+    # every (piece, move) in the order `successors()` gives them
+    moves = [(piece, move) for piece, table in enumerate(tables)
+             for move in range(len(table.moves))]
+
+    trees = [cell.x * height + cell.y
+             for tree in start.trees for cell in tree.cells()]
+
+    # if the boat is on the goal in each of its poses
+    goal = start.goal.pivot.x * height + start.goal.pivot.y
+    at_goal = (tables[0].cells == goal).any(axis=1)
+
+    if verify is not None:
+        verify(start.zobrist, start.key)
+
+    key = list(start.key)
+    key[2] = _orientations.index(key[2])
+    layer = np.array([key], np.int16)
+    ids = np.array([start.zobrist], np.uint64)
+
+    # the ids of every state seen in the layers so far, sorted
+    visited = ids.copy()
+
+    # for each layer after the first, the index of each state's parent in the
+    # layer before, and which of `moves` reached it
+    came_from = []
+
+    depth = 0
+    while len(layer):
+        size = len(layer)
+        next_layers = []
+        next_ids = []
+        parents = []
+        reached_by = []
+        # the (sorted) ids of the states new in each chunk of this layer,
+        # merged into visited once the layer is done
+        seen = []
+        generated = 0
+
+        for offset in range(0, size, chunk_size):
+            chunk = layer[offset:offset + chunk_size]
+            chunk_ids = ids[offset:offset + chunk_size]
+            rows = np.arange(len(chunk))[:, None]
+
+            # which cells are occupied in each state, plus one more that never
+            # is for the tables to pad with
+            occupied = np.zeros((len(chunk), cells + 1), np.bool_)
+            occupied[:, trees] = True
+            poses = []
+            for table in tables:
+                piece_poses = table.poses(chunk, height)
+                occupied[rows, table.cells[piece_poses]] = True
+                poses.append(piece_poses)
+            occupied[:, cells] = False
+
+            # every legal move of every state, as (parent, move) pairs
+            children = []
+            children_ids = []
+            children_parents = []
+            children_moves = []
+            for rank, (piece, move) in enumerate(moves):
+                table = tables[piece]
+                piece_poses = poses[piece]
+                legal = table.legal[move, piece_poses] & ~occupied[
+                    rows, table.swept[move, piece_poses]
+                ].any(axis=1)
+                legal = np.nonzero(legal)[0]
+                if not len(legal):
+                    continue
+
+                before = piece_poses[legal]
+                after = table.to[move, before]
+
+                child = chunk[legal]
+                child[:, table.column:table.column + table.keys.shape[1]] = \
+                    table.keys[after]
+
+                children.append(child)
+                children_ids.append(chunk_ids[legal] ^ table.zobrist[before] ^
+                                    table.zobrist[after])
+                children_parents.append(legal + offset)
+                children_moves.append(np.full(len(legal), rank, np.int16))
+
+            stats.expand_layer(len(chunk), depth)
+            if not children:
+                continue
+
+            # in the order the boards' successors would be generated in
+            children_parents = np.concatenate(children_parents)
+            children_moves = np.concatenate(children_moves)
+            order = np.lexsort((children_moves, children_parents))
+            children = np.concatenate(children)[order]
+            children_ids = np.concatenate(children_ids)[order]
+            children_parents = children_parents[order]
+            children_moves = children_moves[order]
+            generated += len(children)
+
+            if verify is not None:
+                for child_id, child in zip(children_ids.tolist(),
+                                           children.tolist()):
+                    child[2] = _orientations[child[2]]
+                    verify(child_id, tuple(child))
+
+            # keep the first of each state not seen before, in order
+            unique_ids, first = np.unique(children_ids, return_index=True)
+            new = ~_contains(visited, unique_ids)
+            for chunk_seen in seen:
+                new &= ~_contains(chunk_seen, unique_ids)
+            keep = np.sort(first[new])
+            seen.append(unique_ids[new])
+
+            next_layers.append(children[keep])
+            next_ids.append(children_ids[keep])
+            parents.append(children_parents[keep])
+            reached_by.append(children_moves[keep])
+
+            goals = np.nonzero(
+                at_goal[tables[0].poses(children[keep], height)]
+            )[0]
+            if len(goals):
+                came_from.append((np.concatenate(parents),
+                                  np.concatenate(reached_by)))
+                stats.generated += generated
+                stats.duplicates += generated - sum(map(len, next_ids))
+                return start.follow(_moves_to(
+                    came_from, tables, moves,
+                    sum(map(len, next_ids[:-1])) + goals[0]
+                ))
+
+        # the new states are disjoint from visited and each other
+        visited = np.sort(np.concatenate([visited] + seen))
+
+        layer = np.concatenate(next_layers) if next_layers else \
+            np.zeros((0, layer.shape[1]), np.int16)
+        ids = np.concatenate(next_ids) if next_ids else \
+            np.zeros(0, np.uint64)
+        came_from.append((
+            np.concatenate(parents) if parents else np.zeros(0, np.intp),
+            np.concatenate(reached_by) if reached_by else np.zeros(0, np.int16)
+        ))
+
+        stats.generated += generated
+        stats.duplicates += generated - len(layer)
+        stats.fringe_size = len(layer)
+
+        if layer_stats is not None:
+            layer_stats.append({
+                'depth': depth,
+                'size': size,
+                'new': len(layer),
+                'duplicates': generated - len(layer),
+            })
+
+        depth += 1
+
+    return None  # no path means failure
+
+
+def _moves_to(came_from, tables, moves, index):
+    """Follows came_from back from a state in the last layer to the start
+
+    Args:
+        came_from (list[tuple]): the parents and moves of each layer
+        tables (list[_PieceTables]): the tables of each piece
+        moves (list[tuple]): the (piece, move) each move number is
+        index (int): the index of the state in the last layer
+
+    Returns:
+        list[tuple]: the compact actions from the start to the state
+    """
+    path = []
+    for parents, reached_by in reversed(came_from):
+        piece, move = moves[reached_by[index]]
+        path.append(tables[piece].moves[move])
+        index = parents[index]
+
+    path.reverse()
+    return path
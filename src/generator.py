@@ -0,0 +1,384 @@
+"""Generates random puzzles, of any size, to stress test the engine and the
+searches with puzzles much bigger than the ones we were given
+
+Puzzles can optionally be guaranteed to be solvable. Those start from a goal
+state (the boat on the goal) and are scrambled by undoing random moves, so
+the moves that were undone are a path back to the goal. Most moves that can
+be undone are the animals', so undoing boat moves is favoured (see
+`boat_bias`), and scrambling goes on till the boat is some distance from the
+goal (see `min_distance`), else the boat would barely leave the goal. If the
+pieces box the boat in so it can't get that far, they are laid out again
+"""
+
+import argparse
+import random
+import sys
+
+from pieces import Alligator, Turtle, Tree, Boat, Goal
+from board import Board
+from point import Point
+from formatter import file_from_board
+import directions
+
+
+_orientations = ['U', 'R', 'D', 'L']
+
+# how many random spots to try for each piece before giving up on the puzzle
+_placement_tries = 1000
+
+# the chance of undoing a boat move rather than an animal's when scrambling,
+# if one can be undone
+boat_bias = 0.5
+
+# how many times to lay out a solvable puzzle's pieces before giving up on
+# scrambling its boat far enough from the goal
+_scramble_tries = 20
+
+
+def generate(width, height, alligators=0, turtles=0, trees=0,
+             radiation_source=None, magnitude=20, decay=1, seed=None,
+             solvable=False, scramble=None, min_distance=None):
+    """Generates a random puzzle
+
+    Args:
+        width (int): how many cells wide the puzzle is
+        height (int): how many cells tall the puzzle is
+        alligators (Optional[int]): how many alligators to place
+        turtles (Optional[int]): how many turtles to place
+        trees (Optional[int]): how many trees to place
+        radiation_source (Optional[Point]): where the radiation comes from,
+            defaults to a random cell
+        magnitude (Optional[int]): the radiation at the source
+        decay (Optional[int]): how much the radiation drops per cell away
+            from the source
+        seed (Optional[int]): seed for the randomness, so the same puzzle can
+            be generated again
+        solvable (Optional[bool]): if the puzzle must have a path to the goal
+        scramble (Optional[int]): how many moves to undo from the goal state
+            when solvable, defaults to 10 * (width + height)
+        min_distance (Optional[int]): when solvable, moves keep being undone
+            (up to twice scramble of them) till the boat is at least this
+            many cells from the goal, defaults to (width + height) // 4
+
+    Returns:
+        Board: the initial board of the puzzle
+
+    Raises:
+        ValueError: if the pieces do not fit, or a solvable puzzle could not
+            be scrambled min_distance away from the goal
+    """
+    rng = random.Random(seed)
+
+    if not solvable:
+        return _lay_out(rng, width, height, alligators, turtles, trees,
+                        radiation_source, magnitude, decay, solvable)
+
+    if scramble is None:
+        scramble = 10 * (width + height)
+    if min_distance is None:
+        min_distance = (width + height) // 4
+
+    for i in range(_scramble_tries):
+        board = _lay_out(rng, width, height, alligators, turtles, trees,
+                         radiation_source, magnitude, decay, solvable)
+        try:
+            return _scramble(board, rng, scramble, min_distance)
+        except ValueError as error:
+            failure = error  # the boat was boxed in, so lay it out again
+
+    raise failure
+
+
+def _lay_out(rng, width, height, alligators, turtles, trees,
+             radiation_source, magnitude, decay, solvable):
+    """Places the pieces of a puzzle randomly, see `generate()`. For a
+    solvable puzzle the boat is put on the goal
+
+    Returns:
+        Board: the board of the puzzle
+    """
+    board = Board()
+    board.width = width
+    board.height = height
+    board.radiation_source = radiation_source or Point(
+        rng.randrange(width), rng.randrange(height)
+    )
+    board.radition_magnitude = magnitude
+    board.radition_decay = decay
+
+    taken = set()
+    board.goal = Goal(x=rng.randrange(width), y=rng.randrange(height))
+
+    if solvable:
+        # start with the boat on the goal, and keep trees off it
+        orientation = rng.choice(_orientations)
+        back = directions.offset(
+            board.goal.pivot, directions.invert(orientation),
+            rng.randrange(Boat.length)
+        )
+        board.boat = Boat(x=back.x, y=back.y, orientation=orientation)
+        if not _fits(board.boat, width, height, taken):
+            board.boat = _place(Boat, rng, width, height, taken, orientation,
+                                board.goal.pivot)
+        taken.update(_cells(board.boat))
+    else:
+        # trees can't be on the goal either, or it could never be reached
+        taken.add((board.goal.pivot.x, board.goal.pivot.y))
+
+    board.trees = [
+        _place(Tree, rng, width, height, taken, index=i)
+        for i in range(trees)
+    ]
+    for tree in board.trees:
+        taken.update(_cells(tree))
+
+    if not solvable:
+        # anything else can be on the goal
+        taken.discard((board.goal.pivot.x, board.goal.pivot.y))
+        board.boat = _place(Boat, rng, width, height, taken,
+                            avoid=board.goal.pivot)
+        taken.update(_cells(board.boat))
+
+    board.alligators = []
+    for i in range(alligators):
+        board.alligators.append(_place(Alligator, rng, width, height, taken,
+                                       index=i))
+        taken.update(_cells(board.alligators[-1]))
+
+    board.turtles = []
+    for i in range(turtles):
+        board.turtles.append(_place(Turtle, rng, width, height, taken,
+                                    index=i))
+        taken.update(_cells(board.turtles[-1]))
+
+    board.update()
+
+    return board
+
+
+def _cells(piece):
+    """Gets the cells a piece is in as (x, y) tuples, as Points can't be put
+    in sets
+
+    Returns:
+        list[tuple]: the cells of the piece
+    """
+    return [(cell.x, cell.y) for cell in piece.cells()]
+
+
+def _fits(piece, width, height, taken):
+    """Checks if a piece is within the puzzle and not on any taken cell
+
+    Args:
+        piece (Piece): the piece to check
+        width (int): how many cells wide the puzzle is
+        height (int): how many cells tall the puzzle is
+        taken (set[tuple]): the (x, y) cells something is already in
+
+    Returns:
+        bool: True if the piece can be there
+    """
+    for x, y in _cells(piece):
+        if not (0 <= x < width and 0 <= y < height) or (x, y) in taken:
+            return False
+    return True
+
+
+def _place(piece_class, rng, width, height, taken, orientation=None,
+           covering=None, avoid=None, index=None):
+    """Places a piece at a random spot where it fits
+
+    Args:
+        piece_class (class): the class of piece to place
+        rng (Random): the randomness to use
+        width (int): how many cells wide the puzzle is
+        height (int): how many cells tall the puzzle is
+        taken (set[tuple]): the (x, y) cells something is already in
+        orientation (Optional[str]): the orientation the piece must have,
+            defaults to random (or None for trees)
+        covering (Optional[Point]): a cell the piece must be on
+        avoid (Optional[Point]): a cell the piece must not be on
+        index (Optional[int]): the index of the piece
+
+    Returns:
+        Piece: the placed piece
+
+    Raises:
+        ValueError: if no spot was found
+    """
+    for i in range(_placement_tries):
+        piece = piece_class(
+            index=index,
+            x=rng.randrange(width),
+            y=rng.randrange(height),
+            orientation=orientation or (
+                None if piece_class is Tree else rng.choice(_orientations)
+            )
+        )
+
+        cells = piece.cells()
+        if covering is not None and covering not in cells:
+            continue
+        if avoid is not None and avoid in cells:
+            continue
+        if _fits(piece, width, height, taken):
+            return piece
+
+    raise ValueError('Could not find room for a {} in a {}x{} puzzle'.format(
+        piece_class.__name__, width, height
+    ))
+
+
+def _scramble(board, rng, moves, min_distance=1):
+    """Undoes random moves from a board, never going back to a state seen
+    before if it can help it
+
+    Args:
+        board (Board): the board to start from, at the goal
+        rng (Random): the randomness to use
+        moves (int): how many moves to undo
+        min_distance (Optional[int]): how many cells from the goal the boat
+            must end up
+
+    Returns:
+        Board: the scrambled board, which has no parent and is not at the goal
+
+    Raises:
+        ValueError: if the boat could not be scrambled min_distance from the
+            goal
+    """
+    # the boat is off the goal once it is a cell away
+    min_distance = max(min_distance, 1)
+
+    seen = {board.key}
+
+    # undo moves till there were enough and the boat is far enough from the
+    # goal, giving up if it still isn't after as many again
+    for i in range(2 * moves):
+        if i >= moves and _distance(board) >= min_distance:
+            break
+
+        previous = _predecessors(board)
+        if not previous:
+            break
+
+        previous = [key for key in previous if key not in seen] or previous
+        boat_moves = [key for key in previous if key[:3] != board.key[:3]]
+        if boat_moves and rng.random() < boat_bias:
+            previous = boat_moves
+
+        key = rng.choice(previous)
+        seen.add(key)
+        board = board.from_key(key)
+
+    if _distance(board) < min_distance:
+        raise ValueError('Could not scramble the boat {} cells from the '
+                         'goal'.format(min_distance))
+
+    return board
+
+
+def _distance(board):
+    """Gets how far the boat is from the goal
+
+    Returns:
+        int: the least Manhattan distance from a cell of the boat to the
+        goal, 0 if the boat is on it
+    """
+    return min(cell.manhattan_distance_to(board.goal.pivot)
+               for cell in board.boat.cells())
+
+
+def _predecessors(board):
+    """Gets the states one move before a board, that is every state with an
+    action that leads to the board
+
+    Args:
+        board (Board): the board to get the states before
+
+    Returns:
+        list[tuple]: the keys of the states before the board
+    """
+    # each candidate is (the piece as it was before, the move it then did)
+    candidates = []
+
+    # the boat can only move forward, so it came from behind itself
+    boat = board.boat.clone()
+    boat.pivot = directions.offset(
+        boat.pivot, directions.invert(boat.orientation)
+    )
+    candidates.append((boat, 'move_forward'))
+
+    # or it rotated from facing another way
+    for method, undo in (('rotate_clockwise', 'rotate_counter_clockwise'),
+                         ('rotate_counter_clockwise', 'rotate_clockwise')):
+        boat = board.boat.clone()
+        getattr(boat, undo)()
+        candidates.append((boat, method))
+
+    # animals can move both ways, so they came from either side
+    for animal in board.alligators + board.turtles:
+        for method, undo in (('move_forward', 'move_backward'),
+                             ('move_backward', 'move_forward')):
+            moved = animal.clone()
+            getattr(moved, undo)()
+            candidates.append((moved, method))
+
+    predecessors = []
+    for piece, method in candidates:
+        # it had to fit where it was, and the move had to be possible from
+        # there
+        if board.could_come_from(piece, method):
+            predecessors.append(board.key_with(piece))
+
+    return predecessors
+
+
+if __name__ == '__main__':
+    _parser = argparse.ArgumentParser(
+        description='Generates a random puzzle file')
+
+    _parser.add_argument('width', type=int)
+    _parser.add_argument('height', type=int)
+    _parser.add_argument('-a', '--alligators', type=int, default=0)
+    _parser.add_argument('-t', '--turtles', type=int, default=0)
+    _parser.add_argument('-c', '--trees', type=int, default=0,
+                         help='number of (cypress) trees')
+    _parser.add_argument('--source', type=int, nargs=2, default=None,
+                         metavar=('X', 'Y'),
+                         help='radiation source (default: random)')
+    _parser.add_argument('--magnitude', type=int, default=20,
+                         help='radiation at the source (default: 20)')
+    _parser.add_argument('--decay', type=int, default=1,
+                         help='radiation lost per cell away from the source '
+                         '(default: 1)')
+    _parser.add_argument('-s', '--seed', type=int, default=None)
+    _parser.add_argument('--solvable', action='store_true',
+                         help='guarantee there is a path to the goal')
+    _parser.add_argument('--scramble', type=int, default=None,
+                         help='moves to undo from the goal when --solvable '
+                         '(default: 10 * (width + height))')
+    _parser.add_argument('--min-distance', type=int, default=None,
+                         help='cells from the goal the boat must be scrambled '
+                         'to when --solvable (default: (width + height) // 4)')
+    _parser.add_argument('-o', '--output', default=None,
+                         help='file to write the puzzle to (default: stdout)')
+
+    _args = _parser.parse_args()
+
+    try:
+        _board = generate(
+            _args.width, _args.height, _args.alligators, _args.turtles,
+            _args.trees, Point(*_args.source) if _args.source else None,
+            _args.magnitude, _args.decay, _args.seed, _args.solvable,
+            _args.scramble, _args.min_distance
+        )
+    except ValueError as _error:
+        print('Error! {}'.format(_error))
+        sys.exit(1)
+
+    if _args.output:
+        with open(_args.output, 'w') as _file:
+            _file.write(file_from_board(_board))
+    else:
+        print(file_from_board(_board))
@@ -3,89 +3,120 @@
 
 import os
 import os.path
-from time import time
 
 # helper function to deal with parsing the puzzle format
 from formatter import board_from_file, generate_solution_file
-# these are the CLI args, parsed
-from args import args
 # search algorithms
 import search
-
-
-# Step 1. Determine what search algorithm we are using
-try:
-    do_search = getattr(search, args.algorithm.lower())
-except AttributeError:
-    print(
-        "Error! '{}' is not a search algorithm we have implemented".format(
-            args.algorithm
+# reporters that show stats while searching
+from stats import reporters
+# solutions found before
+from cache import SolutionCache
+# saving and resuming long searches
+from checkpoint import Checkpoint
+# the steps shared with batch.py
+from solver import get_algorithm, search_board, solution_path_for, \
+    write_solution
+
+
+def show_better_path(path, bound):
+    """Shows each better path ara_star finds as soon as it is found
+    """
+    print('\nFound a path of {} moves with {} radiation, at most {:.2f} times '
+          'the least radiation possible'.format(
+              len(path), path[-1].boat.radiation if path else 0, bound
+          ))
+
+
+def main():
+    """Solves the puzzle file given on the command line, and writes its
+    solution file
+    """
+    # these are the CLI args, parsed when imported. Imported here, as the
+    # worker processes of hda_star and portfolio may import this file too
+    from args import args
+
+    # Step 1. Determine what search algorithm we are using
+    do_search = get_algorithm(args.algorithm)
+    if do_search is None:
+        print(
+            "Error! '{}' is not a search algorithm we have implemented".format(
+                args.algorithm
+            )
         )
-    )
-    os._exit(1)  # janky
-
-# Step 2. Read in the puzzle file
-if not os.path.isfile(args.file):
-    raise Exception('File `{0}` does not exist!'.format(args.file))
-
-print('Reading file `{}` to solve.'.format(args.file))
-with open(args.file, 'r') as file:
-    contents = file.read()
-
-print('\n=== PUZZLE FILE ===\n{}\n'.format(contents))
-
-# Step 3. Build the initial state, called a `board`
-board = board_from_file(contents)
-print('+--- Initial Board ---+\n{}\n'.format(board))
-
-# Step 4. Use the initial board to search for a solution (path) to the goal
-start = time()
-path = do_search(board)
-end = time()
-search.print_progress(done=True)
-
-time_elapsed = end - start
-
-# now convert to MICROseconds, time_elapsed is in seconds so * by 1,000,000
-time_elapsed = int(round(time_elapsed * 1000000))
-
-if not path:
-    print("Error: Could not find a path!")
-    os._exit(1)
+        os._exit(1)  # janky
+
+    search.verify_hashes = args.verify_hashes
+    if args.max_nodes is not None:
+        search.sma_star_max_nodes = args.max_nodes
+    search.sma_star_max_bytes = args.max_bytes
+    if args.deadline is not None:
+        search.ara_star_deadline = args.deadline
+    search.ara_star_on_solution = show_better_path
+
+    # Step 2. Read in the puzzle file
+    if not os.path.isfile(args.file):
+        raise Exception('File `{0}` does not exist!'.format(args.file))
+
+    print('Reading file `{}` to solve.'.format(args.file))
+    with open(args.file, 'r') as file:
+        contents = file.read()
+
+    print('\n=== PUZZLE FILE ===\n{}\n'.format(contents))
+
+    # Step 3. Build the initial state, called a `board`
+    board = board_from_file(contents)
+    print('+--- Initial Board ---+\n{}\n'.format(board))
+
+    # Step 4. Use the initial board to search for a solution (path) to the goal
+    if args.checkpoint:
+        search.astar_gs_checkpoint = Checkpoint(
+            args.checkpoint, board, args.checkpoint_interval, args.resume
+        )
+    elif args.resume:
+        print('Error! --resume needs the --checkpoint file to resume from')
+        os._exit(1)
 
-# Step 5. Show the path (solution) we found
-print('=== FOUND PATH ===')
-step = 0
-for board in path:
-    print('''
+    cache = None if args.no_cache else SolutionCache(args.cache)
+    path, time_elapsed, stats = search_board(
+        do_search, board, reporters[args.report](), cache
+    )
+    if stats['cached']:
+        print('Using the solution cached in `{}`, which was replayed and '
+              'checked. Its time is that of the search that found it'
+              .format(args.cache))
+
+    if not path:
+        print("Error: Could not find a path!")
+        os._exit(1)
+
+    # Step 5. Show the path (solution) we found
+    print('=== FOUND PATH ===')
+    step = 0
+    for board in path:
+        print('''
 +---- Step: {step} ----+
 | Action: {action}   |
 +-----------------+
 {board}'''.format(
-      step=step,
-      board=board,
-      action=board.parent_action.str_formatted()
-      ))
-    step += 1
+            step=step,
+            board=board,
+            action=board.parent_action.str_formatted()
+        ))
+        step += 1
 
-solution_contents = generate_solution_file(path, time_elapsed)
-print('\n=== SOLUTION ===\n{}'.format(solution_contents))
+    solution_contents = generate_solution_file(path, time_elapsed)
+    print('\n=== SOLUTION ===\n{}'.format(solution_contents))
 
-# Step 6. output the solution to a file so the TAs are happy
-input_filename = os.path.basename(args.file)
-solution_filename = input_filename \
-    .replace('puzzle', 'solution') \
-    .replace('Puzzle', 'Solution')
+    # Step 6. output the solution to a file so the TAs are happy
+    solution_path = solution_path_for(args.file)
 
-solution_dir = './solutions/'
-solution_path = os.path.join(solution_dir, solution_filename)
+    print('\nWriting solution file `{}`'.format(solution_path))
 
-print('\nWriting solution file `{}`'.format(solution_path))
+    write_solution(solution_path, solution_contents)
 
-if not os.path.exists(solution_dir):
-    os.makedirs(solution_dir)
+    print('Done!')
 
-with open(solution_path, 'w+') as file:
-    file.write(solution_contents)
 
-print('Done!')
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,15 @@
 from point import Point
-from action import Action
 import directions
 
 
 class Piece:
     """An object on a game board (base class)"""
+    __slots__ = ['index', 'pivot', 'orientation']
 
     length = 1
 
-    def __init__(self, board=None, index=None, x=-1, y=-1,
-                 orientation=None, original=None):
-        self.board = board
+    def __init__(self, index=None, x=-1, y=-1, orientation=None,
+                 original=None):
         self.index = index
         self.pivot = Point(x, y)
         self.orientation = orientation
@@ -40,13 +39,29 @@ class Piece:
             self.pivot, self.orientation, self.__class__.length-1
         )
 
+    def cells(self):
+        return [
+            directions.offset(self.pivot, self.orientation, i)
+            for i in range(self.__class__.length)
+        ]
+
     def midpoint(self):
         return (self.pivot + self.front()) / 2
 
-    def clone(self, board=None):
-        return self.__class__(board=board, original=self)
+    def clone(self):
+        return self.__class__(original=self)
+
+    def sweeps(self):
+        """Gets the moves this piece has, with the cells each one needs to be
+        empty. Only used to build the move tables of a puzzle, see
+        `Board._build_moves()`
+
+        Returns:
+            list[tuple]: (method name, list of Points it sweeps through)
+        """
+        return []
 
-    def get_actions(self):
+    def get_actions(self, board):
         return []
 
     def __repr__(self):
@@ -58,64 +73,65 @@ class Piece:
 
 
 class Tree(Piece):
-    pass
+    __slots__ = []
 
 
 class Goal(Piece):
-    pass
+    __slots__ = []
 
 
 class MoveForwardPiece(Piece):
+    __slots__ = []
+
     length = 2  # all things that can move forward are at least 2 long
 
-    def can_move_forward(self):
-        return self.board.at(directions.offset(
+    def swept_forward(self):
+        return [directions.offset(
             self.pivot, self.orientation, self.__class__.length
-        )) is None
+        )]
 
     def move_forward(self):
         self.pivot = directions.offset(self.pivot, self.orientation)
 
-    def get_actions(self):
-        actions = super().get_actions()
-
-        if self.can_move_forward():
-            actions.append(Action(self, "move_forward"))
+    def sweeps(self):
+        return super().sweeps() + [("move_forward", self.swept_forward())]
 
-        return actions
+    def get_actions(self, board):
+        return board.actions_of(self)
 
 
 # animals can also move backward
 class Animal(MoveForwardPiece):
-    def can_move_backward(self):
-        return self.board.at(directions.offset(
+    __slots__ = []
+
+    def swept_backward(self):
+        return [directions.offset(
             self.pivot, directions.invert(self.orientation)
-        )) is None
+        )]
 
     def move_backward(self):
         self.pivot = directions.offset(self.pivot, directions.invert(
             self.orientation)
         )
 
-    def get_actions(self):
-        actions = super().get_actions()
-
-        if self.can_move_backward():
-            actions.append(Action(self, "move_backward"))
-
-        return actions
+    def sweeps(self):
+        return super().sweeps() + [("move_backward", self.swept_backward())]
 
 
 class Alligator(Animal):
+    __slots__ = []
+
     length = 3
 
 
 class Turtle(Animal):
-    pass
+    __slots__ = []
 
 
 # boats can rotate
 class Boat(MoveForwardPiece):
+    __slots__ = ['radiation']
+
     def __init__(self, *args, **kwargs):
         self.radiation = 0
         super().__init__(*args, **kwargs)
@@ -124,12 +140,10 @@ class Boat(MoveForwardPiece):
         super()._copy_from(original)
         self.radiation = original.radiation
 
-    def radiate(self):
-        front_raditaion = self.board.radiation_at(self.front())
-        back_radition = self.board.radiation_at(self.pivot)
-        self.radiation += max(0, front_raditaion + back_radition)
+    def radiate(self, board):
+        self.radiation += board.pose_radiation(self.pivot, self.orientation)
 
-    def can_rotate(self, clockwise=True):
+    def swept_rotate(self, clockwise=True):
         offset = Point(0, 1) \
             if self.orientation == "R" or self.orientation == "L" \
             else Point(1, 0)
@@ -149,8 +163,7 @@ class Boat(MoveForwardPiece):
             else -1  # in ['R<', 'U<', 'L>', 'D>']
 
         # if the front and back are clear in the direct we can rotate!
-        return self.board.at(self.front() + offset) is None \
-            and self.board.at(self.pivot + offset) is None
+        return [self.front() + offset, self.pivot + offset]
 
     def rotate_clockwise(self):
         self.orientation = directions.clockwise(self.orientation)
@@ -158,13 +171,8 @@ class Boat(MoveForwardPiece):
     def rotate_counter_clockwise(self):
         self.orientation = directions.counter_clockwise(self.orientation)
 
-    def get_actions(self):
-        actions = super().get_actions()
-
-        if self.can_rotate(True):
-            actions.append(Action(self, "rotate_clockwise"))
-
-        if self.can_rotate(False):
-            actions.append(Action(self, "rotate_counter_clockwise"))
-
-        return actions
+    def sweeps(self):
+        return super().sweeps() + [
+            ("rotate_clockwise", self.swept_rotate(True)),
+            ("rotate_counter_clockwise", self.swept_rotate(False)),
+        ]
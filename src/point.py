@@ -30,6 +30,9 @@ class Point:
     rotate_about  -- rotate around another point
     """
 
+    # a search makes a lot of these, so no __dict__ for each
+    __slots__ = ['x', 'y']
+
     def __init__(self, x=0.0, y=0.0):
         self.x = x
         self.y = y
@@ -4,57 +4,214 @@ boat. New algorithms will be added here, and can be invoked via the CLI.
 For the first assignment follow the trace for `bfts()`
 """
 
+from array import array
+from collections import deque, OrderedDict
+import heapq
+import itertools
 import math
-_iteration = {'i': 0}
+import multiprocessing
+import queue
+import sys
+import time
 
+from action import Action
+import frontier
+from stats import SearchStats
 
-def print_progress(done=False):
-    """This just prints progress so we know searches are not frozen
+# When True every state id handed out is checked against the full key of the
+# first state that had it, so Zobrist hash collisions raise instead of making
+# the searches silently skip a state. Slow, only for verification
+verify_hashes = False
+_verified_keys = {}
+
+# the names of every search algorithm in here, anything else in here is not
+# one (e.g. the heuristics)
+algorithm_names = ['bfts', 'bfgs', 'bfgs_numpy', 'id_dfgs', 'gr_bef_gs',
+                   'astar_gs', 'ida_star', 'sma_star', 'ara_star',
+                   'hda_star', 'portfolio']
+
+
+def state_id(board):
+    """Gets the id searches use to tell board states apart, which is the
+    board's 64 bit Zobrist hash
+
+    Args:
+        board (Board): the board to get the id of
+
+    Returns:
+        int: the id of the board's state
+    """
+    if verify_hashes:
+        _verify_hash(board.zobrist, board.key)
+
+    return board.zobrist
+
+
+def successor_id(board, zobrist, moved):
+    """Gets the id of the state an action derives from a board, from what
+    `Board.preview()` worked out about it, so the board need not be derived
+
+    Args:
+        board (Board): the board the action is of
+        zobrist (int): the hash of the state the action derives
+        moved (Piece): the piece the action moved
+
+    Returns:
+        int: the id of the state
+    """
+    if verify_hashes:
+        _verify_hash(zobrist, board.key_with(moved))
+
+    return zobrist
+
+
+def _verify_hash(zobrist, key):
+    """Checks the key is the first one seen with its hash
+
+    Raises:
+        Exception: if another key had the same hash
+    """
+    first = _verified_keys.setdefault(zobrist, key)
+    if first != key:
+        raise Exception('Zobrist hash collision between {} and {}'.format(
+            first, key
+        ))
+
+
+def _derive(source):
+    """Gets the board of a fringe entry that defers deriving its board, where
+    the entry holds either the board or the Action that derives it
+
+    Args:
+        source (Board|Action): the board, or the action to derive it with
+
+    Returns:
+        Board: the board
+    """
+    if isinstance(source, Action):
+        return source.generate()
+    return source
+
+
+def parameters(name):
+    """Gets the settings of a search algorithm that can change the path it
+    finds, e.g. how long ara_star() searches for. The same algorithm with
+    other settings may find another path, so paths cached for one must not
+    be used for the other
+
+    Args:
+        name (str): the name of the search algorithm
+
+    Returns:
+        dict: the settings, by their name, empty for algorithms with none
+    """
+    if name == 'ida_star':
+        return {'table_size': ida_star_table_size,
+                'growth': ida_star_growth}
+    if name == 'sma_star':
+        return {'max_nodes': sma_star_max_nodes,
+                'max_bytes': sma_star_max_bytes}
+    if name == 'ara_star':
+        return {'weight': ara_star_weight,
+                'weight_step': ara_star_weight_step,
+                'deadline': ara_star_deadline}
+    if name == 'hda_star':
+        return {'workers': hda_star_workers or multiprocessing.cpu_count()}
+    if name == 'portfolio':
+        # the settings of the algorithms it races change its path too
+        return {'algorithms': list(portfolio_algorithms),
+                'grace': portfolio_grace,
+                'settings': {algorithm: parameters(algorithm)
+                             for algorithm in portfolio_algorithms}}
+    return {}
+
+
+def run(algorithm, start, reporter=None, **kwargs):
+    """Runs a search algorithm, keeping stats about the search as it goes
 
     Args:
-        done (Optional[bool]): when True clears the carrier return so print()
-            works as expected int he future, and shows the last iteration
+        algorithm (function|str): the search algorithm, or its name
+        start (Board): the starting board
+        reporter (Optional[Reporter]): what to report the stats to while
+            searching, see stats.py. Defaults to reporting nothing
+        **kwargs: passed on to the algorithm
+
+    Returns:
+        tuple: (path, stats), where path is as returned by the algorithm, and
+        stats the SearchStats of the search
     """
-    i = _iteration['i']
-    _iteration['i'] += 1 if not done else 0
-    if done or \
-        (i > 1000 and i % 100 == 0) or \
-        (i > 500 and i <= 1000 and i % 25 == 0) or \
-            i <= 500:
-        # slow down the speed at which you print progress as print() statements
-        # add time complexity to an already slow process
-        print('Searching... {} search iterations'.format(i),
-              end='\n' if done else '\r')
+    if isinstance(algorithm, str):
+        algorithm = globals()[algorithm]
+
+    stats = SearchStats(reporter)
+    path = algorithm(start, stats=stats, **kwargs)
+    stats.done()
+
+    return path, stats
 
 
 # --- Homework 1 algorithms --- #
 
-def bfts(start):
+def bfts(start, layer_stats=None, stats=None):
     """Breadth First Tree Search. Basically don't use the came_from graph
     shortcut and make your algorithm super slow. Like so slow you could
     probably fly to China and adopt an orphan and teach them to do it by
     hand faster than this BS.
     """
-    return bfs(start, use_came_from=False)
+    return bfs(start, use_came_from=False, layer_stats=layer_stats,
+               stats=stats)
 
 
-def bfgs(start):
+def bfgs(start, layer_stats=None, stats=None):
     """Breadth First Graph Search. Basically store if you came from states to
     no re-enqueu them.
     Note: Not part of homework, just my prefered BFS
     """
-    return bfs(start, use_came_from=True)
+    return bfs(start, use_came_from=True, layer_stats=layer_stats,
+               stats=stats)
+
 
+def _moves_to(came_from, state):
+    """Follows the came_from map back from a state to the start
+
+    Args:
+        came_from (dict): maps each state id to (parent state id, compact
+            action), with the start mapped to None
+        state (int): the id of the state to get the moves to
 
-def bfs(start, use_came_from=True):
+    Returns:
+        list[tuple]: the compact actions from the start to the state
+    """
+    moves = []
+    while came_from[state] is not None:
+        state, move = came_from[state]
+        moves.append(move)
+
+    moves.reverse()
+    return moves
+
+
+def bfs(start, use_came_from=True, layer_stats=None, stats=None):
     """A very basic path finding algorithm (Breadth First Search). When
     given a starting Board, will return a valid path to a Board at a goal state
     Note: because bfts/bfgs are so similar, they are basically combined here,
-    where you can choose to record if we have inspected/came_from a board state
-    already (bfgs), if disabled this becomes bfts
+    where you can choose to skip states we have already came_from (bfgs), if
+    disabled this becomes bfts
+
+    The fringe is searched one layer (depth) at a time, and only holds the
+    keys of boards, a board is re-created from its key when it is inspected.
+    Children are never derived, their ids and keys are worked out with
+    `Board.preview()` and `Board.key_with()`, as most are duplicates. How
+    each state was first reached is recorded in came_from, so the path is
+    built once at the end by following it back and replaying the moves.
 
     Args:
         start (Board): the starting board
+        use_came_from (Optional[bool]): skip children already reached
+        layer_stats (Optional[list]): if given a dict is appended to it for
+            each layer searched, with the layer's 'depth', 'size', and how
+            many of its children were 'new' states or 'duplicates'
+        stats (Optional[SearchStats]): updated as the search goes
 
     Returns:
         list[Board]: A list of boards representing the path, the the first
@@ -63,49 +220,68 @@ def bfs(start, use_came_from=True):
             If None is returned no possible path exists
     """
 
+    if stats is None:
+        stats = SearchStats()
+
     if start.is_boat_at_goal():
         # no need to do anything...
         return []
 
-    # queue of the boards that will have their children searched for goal board
-    fringe = []
-
-    # How we got to each board that went into the fringe.
-    if use_came_from:
-        came_from = {}
+    # How we first got to each state: (parent state id, compact action).
+    came_from = {state_id(start): None}
 
-    # Enqueue start as the first board to have its children searched.
-    fringe.append(start)
+    # keys of the boards that will have their children searched for the goal
+    layer = deque([start.key])
+    depth = 0
 
     # keep exploring children of children... until there are no more.
-    while len(fringe) > 0:
-        print_progress()
-        # the board we are currently exploring.
-        inspect = fringe.pop(0)
-
-        # cycle through the board's children.
-        for child in inspect.generate_child_boards():
-            # if we found the goal, we have the path!
-            if child.is_boat_at_goal():
-                # Follow the path backward to the start from the goal and
-                #   return it.
-                path = [child]
-
-                # Starting at the board we are currently at, insert them
-                #   retracing our steps till we get to the starting board
-                while inspect != start:
-                    path.insert(0, inspect)
-                    inspect = inspect.parent_board  # came_from[inspect.str_id]
-                return path
-            # else we did not find the goal, so enqueue this board's children
-            #   to be inspected
-
-            # if the board has not been added to the fringe yet
-            if not use_came_from or child.str_id not in came_from:
-                # add it to the boards to be explored
-                fringe.append(child)
-                if use_came_from:
-                    came_from[child.str_id] = inspect
+    while layer:
+        next_layer = deque()
+        size = len(layer)
+        new = duplicates = 0
+
+        while layer:
+            key = layer.popleft()
+            stats.fringe_size = len(layer) + len(next_layer)
+            stats.expand(depth)
+            # the board we are currently exploring.
+            inspect = start.from_key(key)
+            inspect_id = state_id(inspect)
+            goal = inspect.goal.pivot
+
+            # cycle through the board's children.
+            for action in inspect.successors():
+                zobrist, _, boat, moved = inspect.preview(action)
+                stats.generated += 1
+
+                child_id = successor_id(inspect, zobrist, moved)
+                if child_id in came_from:
+                    duplicates += 1
+                    stats.duplicates += 1
+                    if use_came_from:
+                        continue  # already been enqueued, so skip it
+                else:
+                    came_from[child_id] = (inspect_id, action.to_tuple())
+                    new += 1
+
+                # if we found the goal, we have the path!
+                if boat.at(goal):
+                    return start.follow(_moves_to(came_from, child_id))
+
+                # else we did not find the goal, so enqueue this board's
+                #   children to be inspected in the next layer
+                next_layer.append(inspect.key_with(moved))
+
+        if layer_stats is not None:
+            layer_stats.append({
+                'depth': depth,
+                'size': size,
+                'new': new,
+                'duplicates': duplicates,
+            })
+
+        layer = next_layer
+        depth += 1
 
     # If we're here, that means that there no path exists to a goal state
     # So signify that by not even giving a path
@@ -114,52 +290,178 @@ def bfs(start, use_came_from=True):
 
 # --- Homework 2 Algorithms --- #
 
-def id_dfgs(start):
+# the most states id_dfgs() remembers the children of between depths. Each
+# takes roughly 800 bytes
+id_dfgs_cache_size = 100000
+
+# one copy of each compact action, shared by every cached list of children
+_interned_moves = {}
+
+
+def id_dfgs(start, stats=None):
     """Iterative Deepening Depth First Graph Search
     Basically do Depth First Search, but only up to a given depth. If no path
     id found, increase the given depth by 1 and try again. Keep doing that, and
     if a path exists, we'll find it
+
+    The children of states are remembered between depths (up to
+    `id_dfgs_cache_size` states), so the shallow depths that every try goes
+    through are not generated again each time. Only their moves and ids are
+    remembered, never Boards, and the cache is filled by the earliest (so
+    shallowest) tries, as once it is full nothing more is added
     """
+    if stats is None:
+        stats = SearchStats()
+
+    successors = {}
     depth = 0
     while True:
-        path = dl_dfgs(start, depth, set())
+        path, cut_off = _dl_dfgs(start, depth, {}, successors, stats)
         if path is not None:  # then at this depth we found a path!
             return path
+        if not cut_off:
+            return None  # nothing was deeper than this, so no path exists
         # else no path was found at this depth, try again at 1 lower
         depth += 1
 
 
-def dl_dfgs(board, depth, visited):
+def dl_dfgs(start, depth, visited=None, successors=None, stats=None):
     """Depth Limited Depth First Graph Search, used in ID-DFGS
-    This is a recursive implementation, so the fringe of boards is maintained
-    in the call stack, rather than a list() like in BFS above
+    This uses an explicit stack of boards rather than recursion, so the depth
+    is not limited by Python's recursion limit
 
-    I could have edited bfs() above to accommodate dfs via popping off the end
-    of the fringe, and adding a depth check, but that is probably just over
-    complicating a single function, and this recursive implementation solves
-    the puzzles just fine.
+    Args:
+        start (Board): the starting board
+        depth (int): the most actions deep to search
+        visited (Optional[dict]): maps the id of each state seen to the
+            shallowest depth it was seen at
+        successors (Optional[dict]): cache of the children of states, see
+            `_successors()`, used and added to (up to `id_dfgs_cache_size`)
+        stats (Optional[SearchStats]): updated as the search goes
+
+    Returns:
+        list[Board]: the path to the goal, or None if there is no path within
+        the depth
     """
-    print_progress()
+    return _dl_dfgs(
+        start,
+        depth,
+        {} if visited is None else visited,
+        {} if successors is None else successors,
+        SearchStats() if stats is None else stats
+    )[0]
 
-    if board.str_id in visited:
-        return  # no need to re-visit node in graph search
 
-    # record this board's hash-able string id as visited so we don't re-visit
-    # (graph search)
-    visited.add(board.str_id)
+def _dl_dfgs(start, depth, visited, successors, stats):
+    """The implementation of `dl_dfgs()`, see it for the args
 
-    if board.is_boat_at_goal():
-        # there is a path to here!
-        # recursively reconstruct it using this list
-        return []
+    Returns:
+        tuple: (path, cut_off), where path is as returned by `dl_dfgs()`, and
+        cut_off is if any board had children deeper than the depth
+    """
+    cut_off = False
 
-    if depth > 0:
-        for child in board.generate_child_boards():
-            path = dl_dfgs(child, depth - 1, visited)
-            if path is not None:
-                # a path exists, so reconstruct it using this child
-                path.insert(0, child)
-                return path
+    # each frame is [children left to search, compact action to the board,
+    # the board or None if its children were cached, the board's key]. The
+    # board of a cached frame is only re-created if one of its children has
+    # to be derived
+    stack = []
+
+    to_visit = (None, state_id(start), start.is_boat_at_goal())
+    while True:
+        if to_visit:
+            move, board_id, at_goal = to_visit
+            to_visit = None
+            board_depth = len(stack)
+
+            # graph search, but a state seen before deeper than it is now
+            # needs to be searched again, as more depth is left below it
+            if visited.get(board_id, math.inf) > board_depth:
+                visited[board_id] = board_depth
+
+                if at_goal:
+                    # there is a path to here! So replay the moves to it
+                    moves = [frame[1] for frame in stack[1:]]
+                    if move is not None:
+                        moves.append(move)
+                    return start.follow(moves), cut_off
+
+                if board_depth < depth:
+                    stats.fringe_size = len(stack)
+                    stats.expand(board_depth)
+
+                    board = None
+                    entry = successors.get(board_id)
+                    if entry is None:
+                        board = _dl_dfgs_board(start, stack, move)
+                        entry = _successors(board)
+                        stats.generated += len(entry[2])
+                        if len(successors) < id_dfgs_cache_size:
+                            successors[board_id] = entry
+
+                    stack.append([
+                        zip(entry[1], entry[2], entry[3]), move, board,
+                        entry[0]
+                    ])
+                else:
+                    cut_off = True
+            else:
+                stats.duplicates += 1
+
+        if not stack:
+            return None, cut_off
+
+        # search the next child of the top board, or backtrack if none left
+        to_visit = next(stack[-1][0], None)
+        if not to_visit:
+            stack.pop()
+
+
+def _dl_dfgs_board(start, stack, move):
+    """Derives the board at the top of `_dl_dfgs()`'s stack after a move
+
+    Args:
+        start (Board): the starting board
+        stack (list): the stack of frames, see `_dl_dfgs()`
+        move (tuple): the compact action from the top board, None for the
+            start
+
+    Returns:
+        Board: the board
+    """
+    if move is None:
+        return start
+
+    frame = stack[-1]
+    if frame[2] is None:
+        frame[2] = start.from_key(frame[3])
+
+    parent = frame[2]
+    piece_name, index, method = move
+    return Action(parent, parent.piece(piece_name, index), method).generate()
+
+
+def _successors(board):
+    """Works out the children of a board with `Board.preview()`, without
+    deriving them
+
+    Returns:
+        tuple: (key, moves, ids, at_goal), the board's key, and the compact
+        action, id and if it is at the goal (as a byte) of each child. Packed
+        like this as many are cached
+    """
+    goal = board.goal.pivot
+    moves = []
+    ids = array('Q')
+    at_goal = bytearray()
+    for action in board.successors():
+        zobrist, _, boat, moved = board.preview(action)
+        move = action.to_tuple()
+        moves.append(_interned_moves.setdefault(move, move))
+        ids.append(successor_id(board, zobrist, moved))
+        at_goal.append(boat.at(goal))
+
+    return board.key, tuple(moves), ids, bytes(at_goal)
 
 
 # --- Homework 3 Algorithms --- #
@@ -167,12 +469,36 @@ def dl_dfgs(board, depth, visited):
 def f(n):
     """Used to estimate the cost from board n to the goal
     """
-    at_goal = n.at(n.goal.pivot)
-    if at_goal is n.boat:
+    return _f(n.boat, n.at(n.goal.pivot), n.goal.pivot)
+
+
+def _f_after(board, at_goal, action, boat, moved):
+    """f() of the board an action derives from a board, without deriving it
+
+    Args:
+        board (Board): the board the action is of
+        at_goal (None|Piece): what is on the goal of that board
+        action (Action): the action
+        boat (Boat): the boat after the action, see `Board.preview()`
+        moved (Piece): the piece the action moved, see `Board.preview()`
+    """
+    goal = board.goal.pivot
+    if moved.at(goal):
+        at_goal = moved
+    elif at_goal is action.piece:
+        at_goal = None  # it moved off the goal
+
+    return _f(boat, at_goal, goal)
+
+
+def _f(boat, at_goal, goal):
+    """f() of a board with the boat and what is on the goal
+    """
+    if at_goal is boat:
         return 0  # no cost, cause it's a goal state
 
     # a rough estimate of the distance to the goal from the boat
-    d = n.boat.midpoint().manhattan_distance_to(n.goal.pivot)
+    d = boat.midpoint().manhattan_distance_to(goal)
 
     # add 1 to the cost because there's something on top of the goal that
     #   needs to be moved, which will require an additional state
@@ -180,177 +506,1213 @@ def f(n):
     return d + off
 
 
-def gr_bef_gs(start):
+def gr_bef_gs(start, stats=None):
     """Greedy, Best First, Graph Search: Search by using the board that appears
     to be the closest to the goal node using some f(n)
     """
+    if stats is None:
+        stats = SearchStats()
 
     # boards that we have investigated (graph search)
     visited = set()
-    # set of boards open to investigation
-    fringe = {str(start): start}
 
-    # scores for boards in one of the sets
-    score = {str(start): f(start)}
+    # ids of the boards open to investigation
+    fringe_ids = {state_id(start)}
 
-    while fringe:
-        print_progress()
+    # heap of boards open to investigation, as (score, order, id, source) so
+    # ties in score are broken by the order they were added in. Children are
+    # scored without being derived, and source is the action that derives
+    # them once they are popped (see `_derive()`), as most never are
+    order = itertools.count()
+    fringe = [(f(start), next(order), state_id(start), start)]
 
-        # find the board in the fringe with the lowest score
-        current = None
-        for key, board in fringe.items():
-            if not current or score[str(board)] < score[str(current)]:
-                current = board
+    while fringe:
+        # the board in the fringe with the lowest score
+        _, _, current_id, source = heapq.heappop(fringe)
+        current = _derive(source)
+        stats.fringe_size = len(fringe)
+        stats.expand(current.depth)
 
         if current.is_boat_at_goal():
-            # then we found a path, return it
-            path = []
-            # reconstruct it
-            while current != start:
-                path.insert(0, current)
-                current = current.parent_board
-            return path
+            # then we found a path, reconstruct and return it
+            return current.path()
 
         # mark this board as investigated (closed)
-        visited.add(str(current))
-        fringe.pop(str(current), None)
+        visited.add(current_id)
+        fringe_ids.discard(current_id)
 
         # add this boards children to be investigated
-        for child in current.generate_child_boards():
-            if str(child) not in visited and str(child) not in fringe:
-                # calculate the heuristics for child board
-                score[str(child)] = f(child)
-                # add child board to open set
-                fringe[str(child)] = child
+        at_goal = current.at(current.goal.pivot)
+        for action in current.successors():
+            stats.generated += 1
+            zobrist, _, boat, moved = current.preview(action)
+            child_id = successor_id(current, zobrist, moved)
+            if child_id not in visited and child_id not in fringe_ids:
+                # add child to open set, scored by its heuristics
+                fringe_ids.add(child_id)
+                heapq.heappush(fringe, (
+                    _f_after(current, at_goal, action, boat, moved),
+                    next(order), child_id, action
+                ))
+            else:
+                stats.duplicates += 1
 
     return None  # no path means failure
 
 
 # --- Homework 4 Algorithms --- #
 
-def astar_f(n):
-    """Used to estimate the cost from board n to the goal
-    Modified for f(n)
-
-    Note: this part of the heuristic is not great, and can overestimate the
-    number of steps required.
-    """
-    at_goal = n.at(n.goal.pivot)
-    if at_goal is n.boat:
-        return 0  # no cost, cause it's a goal state
-
-    # a rough estimate of the distance to the goal from the boat
-    start = n.goal.pivot
-    end = n.boat.midpoint()
-    d = start.manhattan_distance_to(end)
-
-    # add an additional move for a rough estimate of animals in the way along
-    # the Manhattan path
-    point = start.clone()
-    for i in range(math.ceil(d)):
-        dx = end.x - point.x
-        dy = end.y - point.y
-        if dx:
-            point.x += int(dx/abs(dx))
-        if dy:
-            point.y += int(dy/abs(dy))
-
-        at = n.at(point)
-        if at and at is not n.boat:
-            # then something is present, so add an action to move it away
-            d += 1
-
-    """ Disabled because it actually decreased performance in Puzzles
-    # add 1 if there is something in front of the boat
-
-    if not n.boat.can_move_forward():
-        d += 1
-
-    # add 1 if the boat cannot rotate in either direction
-    if not n.boat.can_rotate(True):
-        d += 1
-    if not n.boat.can_rotate(False):
-        d += 1
-    """
-
-    # add 1 to the cost because there's something on top of the goal that
-    #   needs to be moved, which will require an additional state
-    off = 1 if at_goal else 0
-    return d + off
-
-
 def h(n):
-    """Heuristic, the amount of estimated radiation added to get to the board
-    from board n
+    """Heuristic, the least radiation the boat could take to get from board n
+    to the goal if it was alone with the trees. Animals can only get in the
+    way (and moving them costs radiation too), so this never overestimates
     """
-    steps = astar_f(n)
-    rad = min(n.radiation_at(n.boat.pivot), n.radiation_at(n.boat.front()))
-    return math.ceil(steps) * (rad + rad)
+    return n.boat_cost_to_goal()
 
 
 def g(n):
     return n.boat.radiation
 
 
-def astar_gs(start):
+# where astar_gs() checkpoints its state to, see checkpoint.py (None to not)
+astar_gs_checkpoint = None
+
+
+def astar_gs(start, stats=None, checkpoint=None):
     """A pathfinding algorithm (A*) that finds a valid path from this Tile to
     another Tile (graph search)
 
     Args:
         start (Board) - the starting board
+        stats (Optional[SearchStats]) - updated as the search goes
+        checkpoint (Optional[Checkpoint]) - saves the state of the search
+            every so often, and resumes from it if it was saved before.
+            Defaults to `astar_gs_checkpoint`
     Returns:
         (list[Board]) table representing the path. The first element in the
         table will be the first tile in the path, with the last element being
         the goal. An empty table means no path could be found.
     """
+    if stats is None:
+        stats = SearchStats()
+    if checkpoint is None:
+        checkpoint = astar_gs_checkpoint
 
     # boards that we have investigated (graph search)
-    closed = {}
-
-    # set of boards open to investigation
-    fringe = {str(start): start}
+    closed = set()
 
     # scores for boards to get from the start to that board
     # The only g_score we know of is the start, which obviously starts at 0
     # as it costs nothing to get to yourself
-    g_score = {str(start): 0}
-
-    # for each board, the total cost of getting from the start to the goal
-    f_score = {str(start): h(start)}
+    g_score = {state_id(start): 0}
+
+    # heap of boards open to investigation, as (f, h, order, g, id, source)
+    # so ties in f are broken by the lower h, then by the order they were
+    # added in. When a board is found with a better g_score it is just pushed
+    # again, and the old entry is skipped when popped (lazy deletion).
+    # Children are scored without being derived, and source is the action
+    # that derives them once they are popped (see `_derive()`), as most never
+    # are
+    order = itertools.count()
+    start_h = h(start)
+    fringe = [(start_h, start_h, next(order), 0, state_id(start), start)]
+
+    # how each state was first reached, only kept when checkpointing as the
+    # boards resumed from a checkpoint have no parent boards to follow back
+    came_from = None
+    if checkpoint is not None:
+        came_from = {state_id(start): None}
+
+        resumed = checkpoint.load()
+        if resumed is None:
+            checkpoint.reached(state_id(start), start.key, 0, 0, None, None)
+        else:
+            # carry on the stats too, so they cover the whole search
+            states, closed, saved = resumed
+            stats.resume(saved)
+            fringe = []
+            for state, (key, state_g, depth, reached_from) in states.items():
+                g_score[state] = state_g
+                came_from[state] = reached_from
+                if state not in closed:
+                    board = start.from_key(key, state_g)
+                    board.depth = depth
+                    board_h = h(board)
+                    fringe.append((state_g + board_h, board_h, next(order),
+                                   state_g, state_id(board), board))
+            heapq.heapify(fringe)
 
     while fringe:
-        print_progress()
+        # the board in the fringe with the lowest f_score
+        _, _, _, current_g, current_id, source = heapq.heappop(fringe)
 
-        # find the board in the fringe with the lowest f_score
-        current = None
-        for key, board in fringe.items():
-            if not current or f_score[str(board)] < f_score[str(current)]:
-                current = board
+        if current_id in closed or current_g > g_score[current_id]:
+            continue  # stale entry, a better one for this board was pushed
+
+        current = _derive(source)
+        stats.fringe_size = len(fringe)
+        stats.expand(current.depth)
 
         if current.is_boat_at_goal():
-            # then we found a path, return it
-            path = []
-            # reconstruct it
-            while current != start:
-                path.insert(0, current)
-                current = current.parent_board
-            return path
+            # then we found a path, reconstruct and return it
+            if checkpoint is None:
+                return current.path()
+
+            checkpoint.finish()
+            return start.follow(_moves_to(came_from, current_id))
         # else: mark this board as investigated (closed)
-        closed[str(current)] = True
-        del fringe[str(current)]
+        closed.add(current_id)
+
+        if checkpoint is not None:
+            checkpoint.closed(current_id)
+            checkpoint.maybe_save(stats)
 
         # add this boards children to be investigated
-        for child in current.generate_child_boards():
-            if str(child) in closed:
+        for action in current.successors():
+            stats.generated += 1
+            zobrist, child_g, boat, moved = current.preview(action)
+            child_id = successor_id(current, zobrist, moved)
+            if child_id in closed:
+                stats.duplicates += 1
                 continue
 
-            child_g = g(child)
-
-            if str(child) in g_score and child_g >= g_score[str(child)]:
+            if child_id in g_score and child_g >= g_score[child_id]:
+                stats.duplicates += 1
                 continue  # as this g_score is higher than the board we know
 
-            fringe[str(child)] = child
+            g_score[child_id] = child_g
+
+            if checkpoint is not None:
+                move = action.to_tuple()
+                came_from[child_id] = (current_id, move)
+                checkpoint.reached(child_id, current.key_with(moved), child_g,
+                                   current.depth + 1, current_id, move)
 
             # calculate the heuristics for child board
-            g_score[str(child)] = g(child)
-            f_score[str(child)] = h(child) + g(child)
+            child_h = current.boat_cost_to_goal(boat)
+            heapq.heappush(fringe, (
+                child_g + child_h, child_h, next(order), child_g, child_id,
+                action
+            ))
+
+    if checkpoint is not None:
+        checkpoint.finish()
+
+    return None  # no path means failure
+
+
+# --- Memory Bounded Algorithms --- #
+
+# the most states ida_star() remembers in its transposition table
+ida_star_table_size = 250000
+
+# roughly how many times more boards each iteration of ida_star() expands
+# than the one before, see `_ida_star_next_bound()`
+ida_star_growth = 2.0
+
+
+def ida_star(start, table_size=None, growth=None, stats=None):
+    """Iterative Deepening A*: Depth First Search that only goes as deep as
+    boards whose f = g + h is within a bound. If no path is found the bound is
+    raised, and we try again. Like id_dfgs this only needs memory for the
+    current path, but it is guided by h like astar_gs, so it can solve puzzles
+    too big for astar_gs to hold
+
+    Radiation costs are rarely the same, so raising the bound to just the
+    lowest f that went over it (as plain IDA* does) means an iteration for
+    nearly every board. Instead it is raised far enough to expand about
+    `growth` times as many boards (like IDA*_CR), and a path found within it
+    is only kept as the best so far. The rest of the iteration only searches
+    boards with an f below that path's cost, so the path returned is still
+    the cheapest
+
+    Args:
+        start (Board): the starting board
+        table_size (Optional[int]): the most states to remember in the
+            transposition table, defaults to `ida_star_table_size`
+        growth (Optional[float]): roughly how many times more boards each
+            iteration expands, defaults to `ida_star_growth`
+        stats (Optional[SearchStats]): updated as the search goes
+
+    Returns:
+        list[Board]: A list of boards representing the path, the the first
+            element being a valid child Board to the start, and the
+            last element being a Board that is in the goal state.
+            If None is returned no possible path exists
+    """
+    if table_size is None:
+        table_size = ida_star_table_size
+    if growth is None:
+        growth = ida_star_growth
+    if stats is None:
+        stats = SearchStats()
+
+    # transposition table, maps a state's id to [best known h, lowest g it
+    # was searched at, iteration it was searched in]. Kept in least recently
+    # used order, so the oldest entries are evicted when it gets too big
+    table = OrderedDict()
+
+    # no path can cost less than floor, as every board with a lower f was
+    # already searched
+    floor = bound = h(start)
+    iteration = 0
+    while True:
+        # how many boards went over the bound, by their f
+        over_bound = {}
+        expanded = stats.expanded
+        path = _ida_star_iteration(start, bound, floor, iteration, table,
+                                   table_size, over_bound, stats)
+        if path is not None:  # then within this bound we found a path!
+            return path
+
+        if not over_bound:
+            return None  # nothing went over the bound, so no path exists
+
+        # else try again with a higher bound
+        floor = min(over_bound)
+        bound = _ida_star_next_bound(over_bound,
+                                     (stats.expanded - expanded) * growth)
+        iteration += 1
+
+
+def _ida_star_next_bound(over_bound, target):
+    """Gets the bound of the next iteration of IDA*, the lowest one that lets
+    it expand about target boards more than the last. Only the boards that
+    went over the last bound are known, not what is under them, so this may
+    overshoot, which is fine as `_ida_star_iteration()` keeps the best path
+
+    Args:
+        over_bound (dict): how many boards went over the last bound, by f
+        target (number): how many more boards to expand
+
+    Returns:
+        number: the bound
+    """
+    count = 0
+    for over in sorted(over_bound):
+        count += over_bound[over]
+        if count >= target:
+            return over
+
+    return over
+
+
+def _ida_star_iteration(start, bound, floor, iteration, table, table_size,
+                        over_bound, stats):
+    """One iteration of IDA*, searching depth first every board with an f
+    within a bound. This uses an explicit stack, so deep searches are not
+    capped by Python's recursion limit
+
+    Children are scored with `Board.preview()` and ordered by their h, and
+    only derived when they are searched, as most go over the bound
+
+    Args:
+        start (Board): the starting board
+        bound (number): boards with an f over this are not searched
+        floor (number): the least any path can cost, so one this cheap is
+            returned as soon as it is found
+        iteration (int): which iteration of IDA* this is
+        table (OrderedDict): the transposition table, see `ida_star()`
+        table_size (int): the most states to keep in the table
+        over_bound (dict): how many boards went over the bound, by their f,
+            is added to
+        stats (SearchStats): updated as the search goes
+
+    Returns:
+        list[Board]: the cheapest path to the goal within the bound, or None
+    """
+    # each frame is [board, id, g, h, children left to search, lowest f over
+    # the bound in its children, if all children were actually searched]
+    stack = []
+    on_path = set()
+
+    # the cheapest path found so far, and its cost
+    best = None
+    best_g = math.inf
+
+    # the next board to search, as (h, g, id, source), where source is the
+    # board or the action that derives it (see `_derive()`)
+    to_visit = (h(start), g(start), state_id(start), start)
+    while True:
+        if to_visit:
+            board_h, board_g, board_id, source = to_visit
+            to_visit = None
+
+            entry = table.get(board_id)
+            if entry is not None:
+                table.move_to_end(board_id)  # as it was just used
+                board_h = max(board_h, entry[0])
+
+            over = None
+            if board_g + board_h > bound:
+                over = board_g + board_h
+                if over != math.inf:  # else no bound would ever reach it
+                    over_bound[over] = over_bound.get(over, 0) + 1
+            elif board_g + board_h >= best_g:
+                # it can't lead to a cheaper path than the one we have
+                over = board_g + board_h
+            elif entry is not None and entry[2] == iteration and \
+                    entry[1] <= board_g:
+                # already searched from here at least as cheaply within this
+                # bound, so anything it would find we already did
+                over = math.inf
+                stats.duplicates += 1
+            else:
+                board = _derive(source)
+                if board.is_boat_at_goal():
+                    # the path is the boards on the stack (minus the start)
+                    path = [frame[0] for frame in stack[1:]] + \
+                        ([board] if stack else [])
+                    if board_g <= floor:
+                        return path  # nothing can be cheaper
+
+                    best, best_g = path, board_g
+                    over = board_g
+                else:
+                    stats.fringe_size = len(stack)
+                    stats.expand(len(stack))
+
+                    table[board_id] = [board_h, board_g, iteration]
+                    table.move_to_end(board_id)
+                    if len(table) > table_size:
+                        table.popitem(last=False)
+
+                    # search the children that look closest to the goal first
+                    order = itertools.count()
+                    children = []
+                    for action in board.successors():
+                        zobrist, radiation, boat, moved = board.preview(action)
+                        children.append((
+                            board.boat_cost_to_goal(boat), next(order),
+                            radiation, successor_id(board, zobrist, moved),
+                            action
+                        ))
+                    children.sort()
+                    stats.generated += len(children)
+                    stack.append([
+                        board, board_id, board_g, board_h, iter(children),
+                        math.inf, True
+                    ])
+                    on_path.add(board_id)
+
+            if over is not None:
+                if not stack:
+                    return best
+                stack[-1][5] = min(stack[-1][5], over)
+                if over == math.inf:
+                    stack[-1][6] = False
+
+        # find the next child of the top board to search
+        frame = stack[-1]
+        for child_h, _, child_g, child_id, action in frame[4]:
+            if child_id in on_path:
+                frame[6] = False  # a cycle back up the path
+                stats.duplicates += 1
+                continue
+            to_visit = (child_h, child_g, child_id, action)
+            break
+
+        if to_visit:
+            continue
+
+        # else all the children of the top board have been searched
+        stack.pop()
+        on_path.discard(frame[1])
+
+        if frame[6] and frame[1] in table:
+            # back up the lowest f over the bound as this board's h, as no
+            # path from here can cost less than that
+            entry = table[frame[1]]
+            table.move_to_end(frame[1])
+            entry[0] = max(entry[0], frame[5] - frame[2])
+
+        if not stack:
+            return best
+
+        stack[-1][5] = min(stack[-1][5], frame[5])
+        if not frame[6]:
+            stack[-1][6] = False
+
+
+# the most boards sma_star() keeps in memory at once, and roughly the most
+# bytes they can take (None for no limit on bytes)
+sma_star_max_nodes = 100000
+sma_star_max_bytes = None
+
+
+class _SMANode():
+    """A board in the search tree of `sma_star()`
+    """
+    __slots__ = ['board', 'id', 'parent', 'f', 'forgotten', 'children',
+                 'in_open', 'version']
+
+    def __init__(self, board, board_id, parent, f):
+        self.board = board
+        self.id = board_id
+        self.parent = parent
+        self.f = f
+        # the lowest f of the children that were pruned from memory
+        self.forgotten = math.inf
+        # how many of its children are in memory
+        self.children = 0
+        # if it is waiting to be expanded (again)
+        self.in_open = False
+        # bumped each time it is pushed, so old heap entries can be skipped
+        self.version = 0
+
+
+def sma_star(start, max_nodes=None, max_bytes=None, stats=None):
+    """Simplified Memory-bounded A*: A* that only keeps so many boards in
+    memory. When it has too many, the leaf with the highest f (the one that
+    looks the worst) is pruned, and its f is remembered by its parent. The
+    parent goes back in the open list with the lowest f of its pruned
+    children as its f, so it is expanded again (re-generating them) only if
+    nothing else looks better.
+
+    This expands all of a board's children at once, so there must be room
+    for the deepest path plus the children of one board. If there isn't, it
+    may go over the budget by the children of one board
+
+    Args:
+        start (Board): the starting board
+        max_nodes (Optional[int]): the most boards to keep in memory,
+            defaults to `sma_star_max_nodes`
+        max_bytes (Optional[int]): the most bytes of boards to keep in
+            memory, turned into a number of boards by roughly measuring the
+            start board, defaults to `sma_star_max_bytes`. The lower of the
+            two budgets is used
+        stats (Optional[SearchStats]): updated as the search goes
+
+    Returns:
+        list[Board]: A list of boards representing the path, the the first
+            element being a valid child Board to the start, and the
+            last element being a Board that is in the goal state.
+            If None is returned no possible path exists (within the budget)
+    """
+    if max_nodes is None:
+        max_nodes = sma_star_max_nodes
+    if max_bytes is None:
+        max_bytes = sma_star_max_bytes
+    if max_bytes is not None:
+        max_nodes = min(max_nodes, max_bytes // _board_size(start))
+    if stats is None:
+        stats = SearchStats()
+
+    # the boards in memory by state id, and how many boards there are
+    memory = {}
+    in_memory = 0
+
+    # heaps of the open boards, by lowest f (deepest first) to expand, and by
+    # highest f (shallowest first) to prune. Both skip stale entries, and
+    # boards with children in memory are never pruned
+    order = itertools.count()
+    best = []
+    worst = []
+
+    # the board being expanded, which is never forgotten part way through
+    expanding = None
+
+    def push(node):
+        node.in_open = True
+        node.version += 1
+        depth = node.board.depth
+        heapq.heappush(best, (node.f, -depth, next(order), node,
+                              node.version))
+        heapq.heappush(worst, (-node.f, depth, next(order), node,
+                               node.version))
+
+    def is_stale(entry):
+        return not entry[3].in_open or entry[3].version != entry[4]
+
+    def forget(node):
+        """Removes a leaf from memory, and re-opens its parent so the leaf can
+        be re-generated if it ever looks the best again
+        """
+        nonlocal in_memory
+        node.in_open = False
+        in_memory -= 1
+        if memory.get(node.id) is node:
+            del memory[node.id]
+
+        parent = node.parent
+        if parent is None:
+            return
+        parent.forgotten = min(parent.forgotten, node.f)
+        parent.children -= 1
+        if parent.forgotten < math.inf:
+            parent.f = parent.forgotten
+            push(parent)
+        elif parent.children == 0 and parent is not expanding:
+            parent.f = math.inf
+            forget(parent)  # a dead end, so it is not worth remembering
+
+    def move(node, parent, board):
+        """Moves a board that still has children in memory (so can't be
+        forgotten) onto a cheaper path to it, under a new parent, and opens it
+        so its children are re-generated from there
+        """
+        saved = g(node.board) - g(board)
+
+        # (its parent is the same if it was moved itself, and its children
+        # still have the dearer boards from before)
+        old = node.parent
+        if old is not parent:
+            old.children -= 1
+            parent.children += 1
+        if old.children == 0 and not old.in_open:
+            # it has nothing left in memory, so it is a leaf again
+            if old.forgotten < math.inf:
+                old.f = old.forgotten
+                push(old)
+            else:
+                old.f = math.inf
+                forget(old)  # its only child was better reached elsewhere
+
+        # its forgotten children are that much cheaper to reach now too
+        node.forgotten -= saved
+        node.board = board
+        node.parent = parent
+        node.f = max(parent.f, g(board) + h(board))
+        push(node)
+
+    root = _SMANode(start, state_id(start), None, h(start))
+    memory[root.id] = root
+    in_memory = 1
+    push(root)
+
+    while best:
+        entry = heapq.heappop(best)
+        if is_stale(entry):
+            continue
+
+        node = entry[3]
+        node.in_open = False
+        expanding = node
+        current = node.board
+
+        stats.fringe_size = len(best)
+        stats.expand(current.depth)
+
+        if current.is_boat_at_goal():
+            # then we found a path, reconstruct and return it
+            return current.path()
+
+        # (re-)generate its children, the ones still in memory from last time
+        # are skipped as they are known at least as cheaply
+        for child in current.generate_child_boards():
+            stats.generated += 1
+            child_id = state_id(child)
+            child_g = g(child)
+
+            known = memory.get(child_id)
+            if known is not None:
+                if g(known.board) <= child_g:
+                    stats.duplicates += 1
+                    continue  # already in memory at least as cheaply
+                if known.children:
+                    # its children in memory still hang off it, so keep it
+                    # and expand it again from the cheaper path
+                    move(known, node, child)
+                    continue
+                forget(known)  # a leaf that is worse than this child
+
+            # pathmax, so a child never looks better than its parent
+            child_node = _SMANode(child, child_id, node,
+                                  max(node.f, child_g + h(child)))
+            memory[child_id] = child_node
+            in_memory += 1
+            node.children += 1
+            push(child_node)
+
+        node.forgotten = math.inf
+        if node.children == 0:
+            # no children worth remembering, so this is a dead end
+            node.f = math.inf
+            forget(node)
+
+        # prune the worst leaves till we are within the budget, but never the
+        # leaf that would be expanded next
+        while in_memory > max_nodes and worst:
+            entry = worst[0]
+            if is_stale(entry) or entry[3].children:
+                heapq.heappop(worst)
+                continue
+
+            while best and is_stale(best[0]):
+                heapq.heappop(best)
+            if best and best[0][3] is entry[3]:
+                break
+
+            heapq.heappop(worst)
+            forget(entry[3])
+
+    return None  # no path means failure
+
+
+def _board_size(board):
+    """Roughly measures how many bytes a board derived from another takes in
+    `sma_star()`. That is its node, the board itself, its action, and what it
+    does not share with its parent: the boat and the piece that moved, and
+    the list that piece is in
+
+    Args:
+        board (Board): a board of the puzzle to measure
+
+    Returns:
+        int: about how many bytes each board takes
+    """
+    piece = sys.getsizeof(board.boat) + sys.getsizeof(board.boat.pivot)
+
+    return sys.getsizeof(_SMANode(board, 0, None, 0)) + \
+        sys.getsizeof(board) + sys.getsizeof(board.key) + \
+        sys.getsizeof(board.zobrist) + sys.getsizeof(board._occupied) + \
+        sys.getsizeof(Action(board, board.boat, 'move_forward')) + \
+        2 * piece + sys.getsizeof(board.alligators + board.turtles)
+
+
+# --- Anytime Algorithms --- #
+
+# the weight on h ara_star() starts with, how much it is lowered after each
+# search, and how many seconds it searches for (None for no limit)
+ara_star_weight = 3.0
+ara_star_weight_step = 0.5
+ara_star_deadline = 10.0
+
+# invoked as on_solution(path, bound) by ara_star() with each better path
+# found, where the path's radiation is at most bound times the least possible
+ara_star_on_solution = None
+
+
+def ara_star(start, weight=None, weight_step=None, deadline=None,
+             on_solution=None, stats=None):
+    """Anytime Repairing A*: weighted A* (f = g + weight * h) that starts
+    with a high weight, which finds a path fast but maybe not the best one,
+    then keeps lowering the weight to find better paths till the weight is 1
+    (plain A*, so the path is the best possible) or time runs out.
+
+    Each search with a lower weight picks up where the last one left off
+    rather than starting over. Boards whose g improved after they were
+    expanded are not expanded again within a search (their improvements are
+    remembered as inconsistent), and are only re-opened for the next one
+
+    Args:
+        start (Board): the starting board
+        weight (Optional[number]): the first weight, defaults to
+            `ara_star_weight`
+        weight_step (Optional[number]): how much the weight is lowered each
+            time, defaults to `ara_star_weight_step`
+        deadline (Optional[number]): seconds to search for before returning
+            the best path found so far, defaults to `ara_star_deadline`.
+            math.inf for no limit
+        on_solution (Optional[function]): invoked as on_solution(path, bound)
+            with each better path found, where the radiation of the path is
+            at most bound times the least possible. Defaults to
+            `ara_star_on_solution`
+        stats (Optional[SearchStats]): updated as the search goes
+
+    Returns:
+        list[Board]: A list of boards representing the path, the the first
+            element being a valid child Board to the start, and the
+            last element being a Board that is in the goal state.
+            If None is returned no path exists, or none was found in time
+    """
+    if weight is None:
+        weight = ara_star_weight
+    if weight_step is None:
+        weight_step = ara_star_weight_step
+    if deadline is None:
+        deadline = ara_star_deadline
+    if on_solution is None:
+        on_solution = ara_star_on_solution
+    if stats is None:
+        stats = SearchStats()
+
+    if start.is_boat_at_goal():
+        return []
+
+    stop_at = math.inf if deadline is None else time.time() + deadline
+
+    g_score = {state_id(start): 0}
+    closed = set()
+    # boards whose g improved after they were closed, as their state id to
+    # (h, action that derives them)
+    inconsistent = {}
+
+    # heap of (g + weight * h, h, order, g, id, source), stale entries are
+    # skipped. Children are scored without being derived, and source is the
+    # action that derives them once they are popped (see `_derive()`)
+    order = itertools.count()
+    fringe = [(weight * h(start), h(start), next(order), 0, state_id(start),
+               start)]
+
+    best = None  # the goal board with the least radiation found so far
+    best_g = math.inf
+    reported = None  # (g, bound) of the path last passed to on_solution
+
+    while True:
+        timed_out = False
+
+        # search till nothing open looks cheaper than the best path
+        while fringe and fringe[0][0] < best_g:
+            if time.time() >= stop_at:
+                timed_out = True
+                break
+
+            _, _, _, current_g, current_id, source = heapq.heappop(fringe)
+            if current_id in closed or current_g > g_score[current_id]:
+                continue  # stale entry, a better one for this board was pushed
+
+            current = _derive(source)
+            stats.fringe_size = len(fringe)
+            stats.expand(current.depth)
+            closed.add(current_id)
+
+            for action in current.successors():
+                stats.generated += 1
+                zobrist, child_g, boat, moved = current.preview(action)
+                child_id = successor_id(current, zobrist, moved)
+
+                if child_id in g_score and child_g >= g_score[child_id]:
+                    stats.duplicates += 1
+                    # as this g_score is higher than the board we know
+                    continue
+
+                g_score[child_id] = child_g
+
+                child_h = current.boat_cost_to_goal(boat)
+                if boat.at(current.goal.pivot):
+                    if child_g < best_g:
+                        best, best_g = action.generate(), child_g
+                elif child_id in closed:
+                    inconsistent[child_id] = (child_h, action)
+                else:
+                    heapq.heappush(fringe, (
+                        child_g + weight * child_h, child_h, next(order),
+                        child_g, child_id, action
+                    ))
+
+        # every board open or inconsistent is still current
+        fringe = [
+            entry for entry in fringe
+            if entry[4] not in closed and entry[3] == g_score[entry[4]]
+        ]
+        fringe.extend(
+            (0, child_h, 0, g_score[child_id], child_id, action)
+            for child_id, (child_h, action) in inconsistent.items()
+        )
+
+        if best is not None and on_solution is not None:
+            # no path can cost less than the least g + h left to search
+            lowest = min((entry[3] + entry[1] for entry in fringe),
+                         default=best_g)
+            bound = best_g / lowest if lowest else 1.0
+            if not timed_out:
+                bound = min(bound, weight)
+            bound = max(1.0, bound)
+
+            # only pass on paths that are better, or that we now know more
+            # about how good they are
+            if reported is None or best_g < reported[0] or \
+                    bound < reported[1]:
+                reported = (best_g, bound)
+                on_solution(best.path(), bound)
+
+        if timed_out or weight <= 1 or not fringe:
+            return None if best is None else best.path()
+
+        # lower the weight, and search again from every board that was open or
+        # inconsistent, with the boards closed before allowed to be re-opened
+        weight = max(1.0, weight - weight_step)
+        fringe = [
+            (entry_g + weight * entry_h, entry_h, next(order), entry_g,
+             entry_id, source)
+            for _, entry_h, _, entry_g, entry_id, source in fringe
+        ]
+        heapq.heapify(fringe)
+        inconsistent = {}
+        closed = set()
+
+
+# --- Parallel Algorithms --- #
+
+# how many worker processes hda_star() uses, None for the number of CPUs
+hda_star_workers = None
+
+# how often (in seconds) hda_star() checks if its workers died, while
+# waiting for their results
+_hda_star_poll = 0.1
+
+
+def hda_star(start, workers=None, stats=None):
+    """Hash Distributed A*: A* spread across worker processes. Every state is
+    owned by one worker, picked by its id (Zobrist hash), and each worker
+    has its own open and closed lists for the states it owns. Children
+    generated by a worker are sent to their owner over its queue.
+
+    Workers only expand boards with an f under the cheapest goal found so
+    far (the incumbent). The search is over when every worker has nothing
+    left to expand and no children are still in a queue, at which point no
+    board left can lead to a cheaper goal, so the incumbent is optimal
+
+    Args:
+        start (Board): the starting board
+        workers (Optional[int]): how many worker processes to use, defaults
+            to `hda_star_workers`
+        stats (Optional[SearchStats]): the stats of every worker are added to
+            it when the search is over
+
+    Returns:
+        list[Board]: A list of boards representing the path, the the first
+            element being a valid child Board to the start, and the
+            last element being a Board that is in the goal state.
+            If None is returned no possible path exists
+    """
+    if stats is None:
+        stats = SearchStats()
+
+    if start.is_boat_at_goal():
+        return []
+
+    if workers is None:
+        workers = hda_star_workers or multiprocessing.cpu_count()
+
+    shared = {
+        # guards all the values below, so they can be read all at once
+        'lock': multiprocessing.Lock(),
+        # children sent to a worker that it has not handled yet
+        'in_flight': multiprocessing.RawValue('q', 0),
+        # if each worker has nothing left to expand
+        'idle': multiprocessing.RawArray('b', workers),
+        # the cheapest goal found so far, and its state id
+        'incumbent': multiprocessing.RawValue('d', math.inf),
+        'goal_id': multiprocessing.RawValue('Q', 0),
+    }
+    inboxes = [multiprocessing.Queue() for i in range(workers)]
+    results = multiprocessing.Queue()
+
+    processes = [
+        multiprocessing.Process(
+            target=_hda_star_worker,
+            args=(i, start, inboxes, results, shared),
+            daemon=True
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # send the start to its owner
+    start_id = state_id(start)
+    with shared['lock']:
+        shared['in_flight'].value += 1
+    inboxes[start_id % workers].put(
+        (start_id, start.key, g(start), h(start), None, None)
+    )
+
+    came_from = {}
+    try:
+        # wait till every worker is idle with nothing in flight
+        while True:
+            time.sleep(0.01)
+            _hda_star_check(processes)
+            with shared['lock']:
+                if shared['in_flight'].value == 0 and all(shared['idle']):
+                    break
+
+        for inbox in inboxes:
+            inbox.put(None)  # tell the workers to stop
+
+        received = 0
+        while received < workers:
+            # checked before waiting, so anything a worker sent before it
+            # exited will be received while waiting
+            alive = any(process.is_alive() for process in processes)
+            try:
+                worker_came_from, worker_stats = \
+                    results.get(timeout=_hda_star_poll)
+            except queue.Empty:
+                if alive:
+                    continue
+                raise Exception('{} hda_star workers exited without sending '
+                                'their results'.format(workers - received))
+
+            came_from.update(worker_came_from)
+            stats.add(worker_stats)
+            received += 1
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if shared['incumbent'].value == math.inf:
+        return None
+
+    return start.follow(_moves_to(came_from, shared['goal_id'].value))
+
+
+def _hda_star_check(processes):
+    """Checks no worker of `hda_star()` has exited while it is searching, as
+    the others would wait for it forever
+
+    Raises:
+        Exception: if a worker exited
+    """
+    for i, process in enumerate(processes):
+        if not process.is_alive():
+            raise Exception('hda_star worker {} exited with code {} while '
+                            'searching'.format(i, process.exitcode))
+
+
+def _hda_star_worker(index, start, inboxes, results, shared):
+    """A worker process of `hda_star()`. Messages to it are children as
+    (id, key, g, h, parent id, compact action) or None to stop, after which
+    it sends its came_from map and stats (as a dict) to results
+
+    Args:
+        index (int): which worker this is
+        start (Board): the starting board, to re-create boards from keys
+        inboxes (list[Queue]): the queues of every worker
+        results (Queue): where to send came_from and stats when stopping
+        shared (dict): the values shared with every worker, see `hda_star()`
+    """
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    lock = shared['lock']
+    stats = SearchStats()
+
+    closed = set()
+    g_score = {}
+    came_from = {}
+    keys = {}
+
+    # heap of (f, h, order, id, g), stale entries are skipped when popped
+    order = itertools.count()
+    fringe = []
+
+    def receive(message):
+        child_id, key, child_g, child_h, parent_id, move = message
+
+        if child_id in g_score and child_g >= g_score[child_id]:
+            stats.duplicates += 1
+            return  # already seen this state at least as cheaply
+
+        # boards can be expanded out of order in parallel, so a closed
+        # board found again more cheaply must be re-opened
+        closed.discard(child_id)
+        g_score[child_id] = child_g
+        came_from[child_id] = None if parent_id is None else (
+            parent_id, move
+        )
+        keys[child_id] = key
+        heapq.heappush(
+            fringe,
+            (child_g + child_h, child_h, next(order), child_id, child_g)
+        )
+
+    while True:
+        # handle all the children sent to us, waiting for some if idle
+        while True:
+            try:
+                if shared['idle'][index]:
+                    message = inbox.get(timeout=0.01)
+                else:
+                    message = inbox.get_nowait()
+            except queue.Empty:
+                break
+
+            if message is None:
+                stats.fringe_size = len(fringe)
+                results.put((came_from, stats.as_dict()))
+                return
+
+            with lock:
+                shared['idle'][index] = False
+            receive(message)
+            with lock:
+                shared['in_flight'].value -= 1
+
+        # skip stale entries
+        while fringe and (fringe[0][3] in closed or
+                          fringe[0][4] > g_score[fringe[0][3]]):
+            heapq.heappop(fringe)
+
+        if not fringe or fringe[0][0] >= shared['incumbent'].value:
+            # nothing here could lead to a cheaper goal
+            with lock:
+                shared['idle'][index] = True
+            continue
+
+        f, current_h, _, current_id, current_g = heapq.heappop(fringe)
+        closed.add(current_id)
+        current = start.from_key(keys[current_id], current_g)
+        stats.expand()
+
+        if current.is_boat_at_goal():
+            with lock:
+                if current_g < shared['incumbent'].value:
+                    shared['incumbent'].value = current_g
+                    shared['goal_id'].value = current_id
+            continue
+
+        # send the children to the workers that own them
+        outgoing = []
+        for action in current.get_valid_actions():
+            child = action.generate()
+            stats.generated += 1
+            child_id = state_id(child)
+            message = (child_id, child.key, g(child), h(child), current_id,
+                       action.to_tuple())
+
+            owner = child_id % workers
+            if owner == index:
+                receive(message)
+            else:
+                outgoing.append((owner, message))
+
+        if outgoing:
+            with lock:
+                shared['in_flight'].value += len(outgoing)
+            for owner, message in outgoing:
+                inboxes[owner].put(message)
+
+
+# the algorithms portfolio() races against each other
+portfolio_algorithms = ['gr_bef_gs', 'astar_gs', 'ida_star', 'bfgs']
+
+# how many seconds portfolio() waits for better solutions after the first
+portfolio_grace = 1.0
+
+# how many seconds portfolio() waits for a result before checking if its
+# workers are still alive, as one that dies never sends a result
+_portfolio_poll = 0.1
+
+
+def portfolio(start, algorithms=None, grace=None, stats=None):
+    """Races several search algorithms against each other, each in their own
+    process, on the same board. Once one finds a path, the others get a
+    short grace period to find a path with less radiation, then the rest are
+    stopped
+
+    Args:
+        start (Board): the starting board
+        algorithms (Optional[list[str]]): names of the search functions to
+            race, defaults to `portfolio_algorithms`
+        grace (Optional[number]): seconds to wait for better paths after the
+            first one is found, defaults to `portfolio_grace`
+        stats (Optional[SearchStats]): the stats of the algorithm that found
+            the path used are added to it
+
+    Returns:
+        list[Board]: A list of boards representing the path, the the first
+            element being a valid child Board to the start, and the
+            last element being a Board that is in the goal state.
+            If None is returned no possible path exists
+
+    Raises:
+        ValueError: if any of the algorithms is not a search algorithm
+        Exception: if no path was found because workers died
+    """
+    if algorithms is None:
+        algorithms = portfolio_algorithms
+    if grace is None:
+        grace = portfolio_grace
+    if stats is None:
+        stats = SearchStats()
+
+    for name in algorithms:
+        if name not in algorithm_names or name == 'portfolio':
+            raise ValueError(
+                "'{}' is not a search algorithm to race".format(name)
+            )
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_portfolio_worker, args=(name, start, results)
+        )
+        for name in algorithms
+    ]
+    for process in processes:
+        process.start()
+
+    best = None  # (radiation, moves, stats)
+    deadline = None
+    finished = set()  # names of the workers that sent their result
+    died = []
+    try:
+        while len(finished) < len(processes):
+            timeout = _portfolio_poll
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break  # the grace period is over
+                timeout = min(timeout, _portfolio_poll)
+
+            # checked before waiting, so anything a worker sent before it
+            # exited will be received while waiting
+            alive = any(process.is_alive() for process in processes)
+            try:
+                name, radiation, moves, worker_stats = \
+                    results.get(timeout=timeout)
+            except queue.Empty:
+                if alive:
+                    continue
+
+                # every worker is gone, so the rest died without a result
+                died = [name for name in algorithms if name not in finished]
+                break
+
+            finished.add(name)
+            if moves is None:
+                continue  # this one found no path, keep waiting for others
+
+            if best is None or radiation < best[0]:
+                best = (radiation, moves, worker_stats)
+
+            if deadline is None:
+                deadline = time.time() + grace
+    finally:
+        # stop the ones that are still searching
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if best is None:
+        if died:
+            raise Exception('No path found, and these portfolio workers '
+                            'died: {}'.format(', '.join(died)))
+        return None
+
+    stats.add(best[2])
+    return start.follow(best[1])
+
+
+def _portfolio_worker(name, start, results):
+    """A worker process of `portfolio()`, runs one search algorithm and sends
+    (name, radiation, compact actions of the path, stats as a dict) to
+    results, or (name, None, None, stats as a dict) if it found no path
+    """
+    path, stats = run(name, start)
+
+    if path is None:
+        results.put((name, None, None, stats.as_dict()))
+    else:
+        results.put((
+            name,
+            path[-1].boat.radiation if path else 0,
+            [board.parent_action.to_tuple() for board in path],
+            stats.as_dict()
+        ))
+
+
+# --- Vectorized Algorithms --- #
+
+def bfgs_numpy(start, layer_stats=None, stats=None):
+    """Breadth First Graph Search that expands a whole layer at once with
+    NumPy (see frontier.py), which must be installed. Finds the same path as
+    `bfgs()`, much faster on bigger puzzles
+    """
+    return frontier.bfgs(start, layer_stats=layer_stats, stats=stats,
+                         verify=_verify_hash if verify_hashes else None)
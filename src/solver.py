@@ -0,0 +1,170 @@
+"""The steps of solving a puzzle file that are shared between the CLI
+(main.py) and the batch runner (batch.py)
+"""
+
+import os
+import os.path
+from time import time
+
+from formatter import board_from_file, generate_solution_file
+import search
+from stats import SilentReporter
+
+
+def get_algorithm(name):
+    """Gets a search algorithm by its name
+
+    Args:
+        name (str): the name of a search algorithm, one of
+            `search.algorithm_names` (in any case)
+
+    Returns:
+        function: the search algorithm, or None if there is no such algorithm
+    """
+    name = name.lower()
+    if name not in search.algorithm_names:
+        return None
+
+    return getattr(search, name)
+
+
+def search_board(do_search, board, reporter=None, cache=None):
+    """Searches for a path to the goal from a board, timing how long it took
+
+    Args:
+        do_search (function): the search algorithm to use
+        board (Board): the initial board
+        reporter (Optional[Reporter]): what to report the search's stats to
+            while searching, defaults to reporting nothing
+        cache (Optional[SolutionCache]): if given, a path cached for the board
+            and algorithm (with the same parameters) is used instead of
+            searching, and paths found are cached
+
+    Returns:
+        tuple: (path, time_elapsed, stats), where time_elapsed is in
+        MICROseconds and stats is a dict of the search's stats (see
+        `SearchStats.as_dict()`), with 'cached' set if it came from the cache.
+        For a cached path time_elapsed is how long the search that found it
+        took, not how long it took to replay
+    """
+    name = do_search.__name__
+    parameters = search.parameters(name)
+
+    start = time()
+
+    cached = None
+    if cache is not None:
+        cached = cache.get(board, name, parameters)
+
+    if cached is not None:
+        path, entry = cached
+        stats = dict(entry['stats'] or {}, cached=True)
+    else:
+        path, search_stats = search.run(do_search, board, reporter)
+        stats = dict(search_stats.as_dict(), cached=False)
+
+    end = time()
+    elapsed = end - start
+    if cached is None:
+        # the search's own time, which covers the time before it was resumed
+        # too if it was resumed from a checkpoint
+        elapsed = search_stats.elapsed
+
+    # now convert to MICROseconds, time_elapsed is in seconds so * by 1,000,000
+    time_elapsed = int(round(elapsed * 1000000))
+
+    if cached is not None:
+        if cached[1].get('time') is not None:
+            time_elapsed = cached[1]['time']
+    elif cache is not None and path is not None:
+        # after the timer is stopped, as writing (and evicting) is not part
+        # of the search
+        cache.put(board, name, path, search_stats.as_dict(), parameters,
+                  time_elapsed)
+
+    return path, time_elapsed, stats
+
+
+def solution_path_for(puzzle_path, solution_dir='./solutions/'):
+    """Gets where the solution file for a puzzle file goes. The filename will
+    be the puzzle's filename with 'puzzle' replaced with 'solution'
+
+    Args:
+        puzzle_path (str): the path to the puzzle file
+        solution_dir (Optional[str]): the directory solutions go in
+
+    Returns:
+        str: the path to write the solution file to
+    """
+    input_filename = os.path.basename(puzzle_path)
+    solution_filename = input_filename \
+        .replace('puzzle', 'solution') \
+        .replace('Puzzle', 'Solution')
+
+    return os.path.join(solution_dir, solution_filename)
+
+
+def write_solution(solution_path, solution_contents):
+    """Writes a solution file, creating its directory if needed
+
+    Args:
+        solution_path (str): the path to write the solution file to
+        solution_contents (str): the formatted solution
+    """
+    solution_dir = os.path.dirname(solution_path)
+    if solution_dir and not os.path.exists(solution_dir):
+        os.makedirs(solution_dir, exist_ok=True)
+
+    with open(solution_path, 'w+') as file:
+        file.write(solution_contents)
+
+
+def solve_file(puzzle_path, algorithm, solution_dir='./solutions/',
+               cache=None):
+    """Solves a puzzle file and writes its solution file, without printing
+    anything
+
+    Args:
+        puzzle_path (str): the path to the puzzle file
+        algorithm (str): the name of the search algorithm to use
+        solution_dir (Optional[str]): the directory solutions go in
+        cache (Optional[SolutionCache]): the cache of solutions to use
+
+    Returns:
+        dict: stats about the solve, ready to be dumped as JSON
+    """
+    stats = {
+        'puzzle': puzzle_path,
+        'algorithm': algorithm,
+        'solved': False,
+    }
+
+    do_search = get_algorithm(algorithm)
+    if do_search is None:
+        stats['error'] = "'{}' is not a search algorithm we have " \
+            "implemented".format(algorithm)
+        return stats
+
+    with open(puzzle_path, 'r') as file:
+        board = board_from_file(file.read())
+
+    path, time_elapsed, stats['search'] = search_board(
+        do_search, board, SilentReporter(), cache
+    )
+    stats['time'] = time_elapsed
+
+    if path is None:
+        stats['error'] = 'Could not find a path!'
+        return stats
+
+    stats['solved'] = True
+    stats['length'] = len(path)
+    stats['radiation'] = path[-1].boat.radiation if path else 0
+
+    if path:
+        stats['solution'] = solution_path_for(puzzle_path, solution_dir)
+        write_solution(
+            stats['solution'], generate_solution_file(path, time_elapsed)
+        )
+
+    return stats
@@ -0,0 +1,207 @@
+"""Statistics about a search as it runs, and reporters to show them
+
+Searches update a SearchStats as they go, which is cheap (mostly adding to
+ints), and its reporter decides if and how often to actually show them
+"""
+
+import json
+import sys
+from time import time
+
+
+class SearchStats():
+    """Counts what a search has done so far
+    """
+
+    def __init__(self, reporter=None):
+        """Creates stats for a search that is just starting
+
+        Args:
+            reporter (Optional[Reporter]): what to report the stats to,
+                defaults to a SilentReporter
+        """
+        self.reporter = reporter or SilentReporter()
+
+        # boards that had their children generated
+        self.expanded = 0
+        # children generated
+        self.generated = 0
+        # children that were skipped as their state was already seen
+        self.duplicates = 0
+        # boards waiting to be expanded, as of the last update
+        self.fringe_size = 0
+        # the deepest board expanded
+        self.max_depth = 0
+
+        self.started = time()
+        self.elapsed = 0.0
+        self.is_done = False
+
+    def expand(self, depth=None):
+        """Records that a board is being expanded, and reports the stats if
+        the reporter wants them
+
+        Args:
+            depth (Optional[int]): how many actions deep the board is
+        """
+        self.expanded += 1
+        if depth is not None and depth > self.max_depth:
+            self.max_depth = depth
+
+        # checking the time every expansion would be slow in itself
+        if not self.expanded & 0xff:
+            self.elapsed = time() - self.started
+            self.reporter.update(self)
+
+    def expand_layer(self, count, depth=None):
+        """Records that many boards are being expanded at once, for searches
+        that expand whole layers (see frontier.py), and reports the stats
+
+        Args:
+            count (int): how many boards
+            depth (Optional[int]): how many actions deep the boards are
+        """
+        self.expanded += count
+        if depth is not None and depth > self.max_depth:
+            self.max_depth = depth
+
+        self.elapsed = time() - self.started
+        self.reporter.update(self)
+
+    def add(self, other):
+        """Adds the counts of another search to these, for searches made of
+        other searches (e.g. in worker processes)
+
+        Args:
+            other (dict): the other stats, as from `as_dict()`
+        """
+        self.expanded += other['expanded']
+        self.generated += other['generated']
+        self.duplicates += other['duplicates']
+        self.fringe_size += other['fringe_size']
+        self.max_depth = max(self.max_depth, other['max_depth'])
+
+    def resume(self, saved):
+        """Carries on from the stats of a search that was saved part way
+        through, for searches resumed from a checkpoint (see checkpoint.py),
+        so they cover all of the search rather than just the resumed part
+
+        Args:
+            saved (dict): the saved stats, with the 'elapsed' seconds,
+                'expanded', 'generated', 'duplicates' and 'max_depth'
+        """
+        self.started -= saved['elapsed']
+        self.expanded += saved['expanded']
+        self.generated += saved['generated']
+        self.duplicates += saved['duplicates']
+        self.max_depth = max(self.max_depth, saved['max_depth'])
+
+    def done(self):
+        """Records that the search is over, and reports the final stats
+        """
+        self.elapsed = time() - self.started
+        self.is_done = True
+        self.reporter.done(self)
+
+    def as_dict(self):
+        """Gets the stats as a dict
+
+        Returns:
+            dict: the stats, ready to be dumped as JSON
+        """
+        elapsed = self.elapsed or (time() - self.started)
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'fringe_size': self.fringe_size,
+            'max_depth': self.max_depth,
+            'elapsed': elapsed,
+            'expanded_per_second': self.expanded / elapsed if elapsed else 0,
+        }
+
+    def __str__(self):
+        """string representation override
+
+        Returns:
+            str: the stats in one human readable line
+        """
+        return 'Searching... {s.expanded} expanded, {s.generated} ' \
+            'generated, {s.duplicates} duplicates, fringe of ' \
+            '{s.fringe_size}, max depth {s.max_depth}, {s.elapsed:.1f}s' \
+            .format(s=self)
+
+
+class SilentReporter():
+    """Reports nothing (the base class of all reporters)
+    """
+
+    def update(self, stats):
+        """Invoked every so often while searching
+
+        Args:
+            stats (SearchStats): the stats of the search so far
+        """
+        pass
+
+    def done(self, stats):
+        """Invoked once the search is over
+
+        Args:
+            stats (SearchStats): the final stats of the search
+        """
+        pass
+
+
+class TerminalReporter(SilentReporter):
+    """Reports the stats on one line of the terminal, that is rewritten at
+    most every `interval` seconds so we know searches are not frozen
+    """
+
+    def __init__(self, interval=0.25, file=None):
+        self.interval = interval
+        self.file = file  # None for whatever sys.stdout is when printing
+        self._last = 0.0
+
+    def update(self, stats):
+        if stats.elapsed - self._last >= self.interval:
+            self._last = stats.elapsed
+            print(stats, end='\r', file=self.file, flush=True)
+
+    def done(self, stats):
+        # ends with a new line so print() works as expected afterwards
+        print(stats, file=self.file)
+
+
+class JSONReporter(SilentReporter):
+    """Reports the stats as JSON lines, at most every `interval` seconds and
+    once when done
+    """
+
+    def __init__(self, interval=1.0, file=None):
+        self.interval = interval
+        self.file = file  # None for whatever sys.stderr is when writing
+        self._last = 0.0
+
+    def update(self, stats):
+        if stats.elapsed - self._last >= self.interval:
+            self._last = stats.elapsed
+            self._write(stats)
+
+    def done(self, stats):
+        self._write(stats)
+
+    def _write(self, stats):
+        record = stats.as_dict()
+        record['done'] = stats.is_done
+        file = self.file or sys.stderr
+        file.write(json.dumps(record) + '\n')
+        file.flush()
+
+
+# the reporters that can be picked by name from the CLI
+reporters = {
+    'terminal': TerminalReporter,
+    'json': JSONReporter,
+    'silent': SilentReporter,
+}